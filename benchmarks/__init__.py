@@ -0,0 +1,3 @@
+"""
+Contains benchmarks and a synthetic corpus generator for the Review Toolkit.
+"""
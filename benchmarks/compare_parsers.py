@@ -0,0 +1,108 @@
+"""Module for checking the parsers of utils.load_data against each other.
+
+This module generates task files, including malformed ones with markers at
+unusual positions, stray indents, blank lines and mixed line endings, and
+checks that every parser in PARSERS returns the same data as the validating
+parser. The line parser rejects malformed files as a whole, so it is only
+checked on the files the validating parser found no problems in. It then
+times the parsers on a large generated file.
+
+Functions:
+    generate_mutated_text: Return a task file text with random defects.
+    compare_parsers: Check every parser against the validating parser.
+    time_parsers: Time every parser on one file.
+
+Usage:
+    Run this module to check and time the parsers:
+        python -m benchmarks.compare_parsers --files 500
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from benchmarks.generate_corpus import generate_task_text
+from utils.load_data import ERROR_TAB, PARSERS
+
+MUTATIONS = ("# tab", "# tab Extra", "    # checkbox", "    # checkbox Extra",
+             "# checkbox", "  # checkbox", "\t   # checkbox x", "        # tab",
+             "xx # tab", "", "    ", "        ", "  body", "\r", "# tabular",
+             "    # checkboxes", "é   # checkbox", "        # checkbox inside",
+             "# tab Repeated", "\x00")
+"""Lines inserted at random to produce malformed files."""
+
+
+def generate_mutated_text(rng) -> str:
+    """Return a task file text with random defects."""
+    text = generate_task_text(tabs=rng.randint(0, 4),
+                              checkboxes=rng.randint(0, 4),
+                              body_lines=rng.choice((0, 1, 2, 3, 3)),
+                              line_words=rng.choice((0, 1, 4, 4)),
+                              seed=rng.randint(0, 10 ** 6))
+    lines = text.split("\n")
+    # Many files keep a valid layout, so that fast paths are checked too.
+    for _ in range(rng.choice((0, 0, 1, 2, 6))):
+        lines.insert(rng.randint(0, len(lines)), rng.choice(MUTATIONS))
+    for _ in range(rng.choice((0, 0, 1, 3))):
+        if lines:
+            lines.pop(rng.randrange(len(lines)))
+    newline = rng.choice(("\n", "\r\n", "\n"))
+    return newline.join(lines) + rng.choice(("", "\n"))
+
+
+def compare_parsers(files:int, seed:int=0) -> int:
+    """
+    Check every parser against the validating parser on generated files.
+
+    Returns:
+    - int: The number of files on which a parser differed.
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "task.txt")
+        for index in range(files):
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                file.write(generate_mutated_text(rng))
+            expected = PARSERS["validating"](path)
+            for name, parser in PARSERS.items():
+                if name == "line" and ERROR_TAB in expected:
+                    continue    # Only the validating parser recovers.
+                if parser(path) != expected:
+                    mismatches += 1
+                    print(f"File {index}: parser '{name}' differs")
+    return mismatches
+
+
+def time_parsers(path:str, repeat:int) -> dict:
+    """Return the best time in seconds of every parser on the file at path."""
+    timings = {}
+    for name, parser in PARSERS.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parser(path)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+if __name__ == "__main__":
+    parser_arguments = argparse.ArgumentParser(description="Check and time the parsers.")
+    parser_arguments.add_argument("--files", type=int, default=500)
+    parser_arguments.add_argument("--seed", type=int, default=0)
+    parser_arguments.add_argument("--repeat", type=int, default=3)
+    arguments = parser_arguments.parse_args()
+
+    mismatch_count = compare_parsers(arguments.files, arguments.seed)
+    print(f"{arguments.files} files, {mismatch_count} mismatches")
+
+    with tempfile.TemporaryDirectory() as large_directory:
+        large_path = os.path.join(large_directory, "large.txt")
+        with open(large_path, "w", encoding="utf-8") as large_file:
+            large_file.write(generate_task_text(tabs=200, checkboxes=500, body_lines=4))
+        parser_timings = time_parsers(large_path, arguments.repeat)
+    for parser_name, timing in parser_timings.items():
+        print(f"{parser_name:<10}{timing * 1000:>10.1f} ms"
+              f"{parser_timings['line'] / timing:>8.2f}x")
@@ -0,0 +1,125 @@
+"""Module for generating synthetic review files.
+
+This module writes task files in the "# tab" / "# checkbox" format at
+configurable sizes, for use by the benchmarks. The content is generated from
+a seeded random generator, so the same arguments always produce the same
+file.
+
+Functions:
+    generate_task_text: Return the text of a synthetic task file.
+    generate_task_file: Write a synthetic task file.
+    generate_corpus: Write a directory tree of synthetic task files.
+
+Usage:
+    Run this module to write a single file, for example:
+        python -m benchmarks.generate_corpus out.txt --tabs 50 --checkboxes 200
+"""
+
+import argparse
+import os
+import random
+
+ASCII_WORDS = ("review", "submission", "commit", "branch", "function", "test",
+               "variable", "loop", "class", "module", "requirement", "output",
+               "input", "error", "screenshot", "repository", "README", "NAME")
+UNICODE_WORDS = ("ünïcödé", "café", "naïve", "日本語", "проверка", "✅", "❌",
+                 "🔍", "🔗", "ελληνικά")
+
+
+def generate_words(rng, count:int, unicode_ratio:float) -> str:
+    """Return count random words, a fraction of which are non-ASCII."""
+    return " ".join(
+        rng.choice(UNICODE_WORDS if rng.random() < unicode_ratio else ASCII_WORDS)
+        for _ in range(count)
+        )
+
+
+def generate_task_text(tabs:int=10, checkboxes:int=20, body_lines:int=3,
+                       line_words:int=12, unicode_ratio:float=0.1,
+                       seed:int=0) -> str:
+    """
+    Return the text of a synthetic task file.
+
+    Args:
+    - tabs (int): The number of tabs.
+    - checkboxes (int): The number of checkboxes in every tab.
+    - body_lines (int): The number of text lines in every checkbox.
+    - line_words (int): The number of words in every text line.
+    - unicode_ratio (float): The fraction of words that are non-ASCII.
+    - seed (int): The seed of the random generator.
+
+    Returns:
+    - str: The text of the file.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for tab in range(tabs):
+        lines.append(f"# tab Tab {tab} {generate_words(rng, 2, unicode_ratio)}")
+        for checkbox in range(checkboxes):
+            lines.append(f"    # checkbox {tab}.{checkbox} "
+                         f"{generate_words(rng, 2, unicode_ratio)}")
+            for _ in range(body_lines):
+                lines.append(f"        {generate_words(rng, line_words, unicode_ratio)}")
+            lines.append("    # checkbox")
+            lines.append("")
+        lines.append("# tab")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_task_file(path:str, **kwargs) -> int:
+    """
+    Write a synthetic task file, see generate_task_text for the arguments.
+
+    Returns:
+    - int: The size of the file in bytes.
+    """
+    text = generate_task_text(**kwargs)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+    return os.path.getsize(path)
+
+
+def generate_corpus(directory:str, files:int=10, folders:int=2, **kwargs) -> list:
+    """
+    Write a directory tree of synthetic task files.
+
+    Args:
+    - directory (str): The directory to write the files to.
+    - files (int): The number of files in every folder.
+    - folders (int): The number of subfolders, each holding files.
+    - kwargs: Passed on to generate_task_text.
+
+    Returns:
+    - list: The paths of the written files.
+    """
+    seed = kwargs.pop("seed", 0)
+    paths = []
+    for folder in range(folders + 1):
+        folder_path = directory if folder == 0 else os.path.join(directory, f"Folder {folder}")
+        os.makedirs(folder_path, exist_ok=True)
+        for file in range(files):
+            path = os.path.join(folder_path, f"file_{file:04d}.txt")
+            generate_task_file(path, seed=seed + len(paths), **kwargs)
+            paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic task file.")
+    parser.add_argument("path")
+    parser.add_argument("--tabs", type=int, default=10)
+    parser.add_argument("--checkboxes", type=int, default=20)
+    parser.add_argument("--body-lines", type=int, default=3)
+    parser.add_argument("--line-words", type=int, default=12)
+    parser.add_argument("--unicode-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    size = generate_task_file(arguments.path,
+                              tabs=arguments.tabs,
+                              checkboxes=arguments.checkboxes,
+                              body_lines=arguments.body_lines,
+                              line_words=arguments.line_words,
+                              unicode_ratio=arguments.unicode_ratio,
+                              seed=arguments.seed)
+    print(f"Wrote {size} bytes to {arguments.path}")
@@ -0,0 +1,328 @@
+"""Module for benchmarking the loading, rendering and copy paths.
+
+This module generates a synthetic corpus at several sizes and times parsing,
+validation, building the body frame and copying to the clipboard. The UI
+benchmarks run under a headless Xvfb display when no display is available.
+Results are saved as JSON so that runs on different commits can be compared.
+
+Functions:
+    run_benchmarks: Run every benchmark and return the results.
+    compare_results: Print the change between two saved results.
+
+Usage:
+    Run the benchmarks and save the results:
+        python -m benchmarks.run_benchmarks --output before.json
+    Compare two saved results:
+        python -m benchmarks.run_benchmarks --compare before.json after.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.generate_corpus import generate_task_file
+from utils.cache import load_cached_task_data
+from utils.clipboard import BACKENDS
+from utils.lazy_load import index_task_data
+from utils.load_data import ensure_data_integrity, load_task_data
+
+SIZES = {
+    "small": {"tabs": 5, "checkboxes": 20, "body_lines": 2},
+    "medium": {"tabs": 50, "checkboxes": 200, "body_lines": 4},
+    "large": {"tabs": 200, "checkboxes": 2000, "body_lines": 4},
+}
+"""The corpus sizes to benchmark, passed on to generate_task_file."""
+
+
+def time_function(function, repeat:int, setup=None) -> dict:
+    """
+    Time function repeat times.
+
+    Args:
+    - function (callable): The function to time.
+    - repeat (int): The number of times to call function.
+    - setup (callable): Called before every call, outside of the timing.
+
+    Returns:
+    - dict: The minimum, median and mean time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeat": repeat
+        }
+
+
+def benchmark_parsing(path:str, repeat:int, cache_directory:str) -> dict:
+    """Time loading and validating the file at path."""
+    # ensure_data_integrity checks the dictionary built by the parser.
+    data = {label: [tuple(checkbox) for checkbox in tab]
+            for label, tab in load_task_data(path).items()}
+    load_cached_task_data(path, cache_directory)    # Warm the cache.
+    return {
+        "load_task_data": time_function(lambda: load_task_data(path), repeat),
+        "load_task_data_line": time_function(lambda: load_task_data(path, "line"), repeat),
+        "load_task_data_validating": time_function(
+            lambda: load_task_data(path, "validating"), repeat
+            ),
+        "ensure_data_integrity": time_function(lambda: ensure_data_integrity(data), repeat),
+        "index_task_data": time_function(lambda: index_task_data(path), repeat),
+        "load_cached_task_data": time_function(
+            lambda: load_cached_task_data(path, cache_directory), repeat
+            ),
+        }
+
+
+def start_display():
+    """
+    Start a headless Xvfb display if there is no display to use.
+
+    Returns:
+    - subprocess.Popen: The Xvfb process, or None if none was started.
+    """
+    if os.environ.get("DISPLAY") or not sys.platform.startswith("linux"):
+        return None
+    if shutil.which("Xvfb") is None:
+        return None
+
+    display = 99
+    while os.path.exists(f"/tmp/.X11-unix/X{display}"):
+        display += 1
+    process = subprocess.Popen(
+        ["Xvfb", f":{display}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+        )
+    for _ in range(50):
+        if os.path.exists(f"/tmp/.X11-unix/X{display}"):
+            break
+        time.sleep(0.1)
+    os.environ["DISPLAY"] = f":{display}"
+    return process
+
+
+def benchmark_ui(path:str, other_path:str, repeat:int) -> dict:
+    """Time building and reloading the body frame and copying from it."""
+    # pylint: disable=import-outside-toplevel
+    import tkinter as tk
+    from modules.body_frame import BodyFrame
+
+    data = load_task_data(path)
+    other_data = load_task_data(other_path)
+    results = {}
+
+    root = tk.Tk()
+    root.geometry("300x800")
+    root.update()
+    try:
+        # Every build gets its own window, the bindings of a body frame are
+        # only removed with the window it was built in.
+        built = []
+
+        def close_window():
+            if built:
+                window, body_frame = built.pop()
+                # Timers outlive the window, a pending layout would run on
+                # destroyed widgets.
+                if body_frame.layout.after_id is not None:
+                    window.after_cancel(body_frame.layout.after_id)
+                window.destroy()
+
+        def open_window():
+            close_window()
+            window = tk.Toplevel(root)
+            window.geometry("300x800")
+            window.update()
+            built.append((window, None))
+
+        def build():
+            window = built[-1][0]
+            built[-1] = (window, BodyFrame(window, [data, data], [path, path], (1, 1)))
+            window.update_idletasks()
+        results["create_body_frame"] = time_function(build, repeat, setup=open_window)
+        close_window()
+
+        body_frame = BodyFrame(root, [data, data], [path, path], (1, 1))
+        root.update()
+
+        def reload_frame(new_data):
+            body_frame.data[0] = new_data
+            body_frame.load_frame()
+            root.update_idletasks()
+        results["load_frame_unchanged"] = time_function(lambda: reload_frame(data), repeat)
+        results["load_frame_changed"] = time_function(
+            lambda: reload_frame(other_data),
+            repeat,
+            setup=lambda: reload_frame(data)
+            )
+
+        def select_every_tab():
+            notebook = body_frame.frames[0][0]
+            for tab in notebook.tabs():
+                notebook.select(tab)
+                body_frame.materialize_tab(0, notebook.nametowidget(tab))
+            root.update_idletasks()
+        results["materialize_every_tab"] = time_function(
+            select_every_tab,
+            1,
+            setup=lambda: reload_frame(data)
+            )
+
+        def check_every_box():
+            notebook = body_frame.frames[0][0]
+            tab = notebook.nametowidget(notebook.select())
+            body_frame.materialize_tab(0, tab)
+            checkbox_list = body_frame.frames[0][2][tab]
+            checkbox_list.checked = bytearray(b"\x01" * len(checkbox_list.items))
+        try:
+            results["copy_to_clipboard"] = time_function(
+                lambda: body_frame.copy_to_clipboard(0),
+                repeat,
+                setup=check_every_box
+                )
+        except Exception as error:  # pylint: disable=broad-except
+            # Clipboard backends depend on the platform, report and go on.
+            results["copy_to_clipboard"] = {"error": repr(error)}
+
+        # Latency of every clipboard backend with the text of a whole tab.
+        text = "\n".join(text for _, text in next(iter(data.values())))
+        for name, backend_class in BACKENDS.items():
+            backend = backend_class(root)
+            try:
+                results[f"clipboard_{name}"] = time_function(
+                    lambda backend=backend: backend.copy(text), repeat
+                    )
+            except Exception as error:  # pylint: disable=broad-except
+                results[f"clipboard_{name}"] = {"error": repr(error)}
+    finally:
+        root.destroy()
+    return results
+
+
+def run_benchmarks(sizes:list, repeat:int, ui:bool=True) -> dict:
+    """
+    Run every benchmark on a freshly generated corpus.
+
+    Args:
+    - sizes (list): The names of the SIZES to benchmark.
+    - repeat (int): The number of times every benchmark is repeated.
+    - ui (bool): Run the UI benchmarks as well.
+
+    Returns:
+    - dict: The metadata of the run and the results of every size.
+    """
+    results = {"meta": get_metadata(), "results": {}}
+    display = start_display() if ui else None
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache_directory = os.path.join(directory, ".cache")
+            for size in sizes:
+                path = os.path.join(directory, f"{size}.txt")
+                other_path = os.path.join(directory, f"{size}_other.txt")
+                file_size = generate_task_file(path, seed=1, **SIZES[size])
+                generate_task_file(other_path, seed=2, **SIZES[size])
+
+                size_results = {
+                    "corpus": dict(SIZES[size], bytes=file_size),
+                    "parsing": benchmark_parsing(path, repeat, cache_directory)
+                    }
+                if ui:
+                    try:
+                        size_results["ui"] = benchmark_ui(path, other_path, repeat)
+                    except Exception as error:  # pylint: disable=broad-except
+                        size_results["ui"] = {"error": repr(error)}
+                results["results"][size] = size_results
+                print_results(size, size_results)
+    finally:
+        if display is not None:
+            display.terminate()
+    return results
+
+
+def get_metadata() -> dict:
+    """Return the commit, interpreter and platform the benchmarks ran on."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+
+def flatten_results(results:dict) -> dict:
+    """Return {"size/group/benchmark": timing} of a result file."""
+    flat = {}
+    for size, size_results in results["results"].items():
+        for group in ("parsing", "ui"):
+            for name, timing in size_results.get(group, {}).items():
+                if isinstance(timing, dict) and "median" in timing:
+                    flat[f"{size}/{group}/{name}"] = timing
+    return flat
+
+
+def print_results(size:str, size_results:dict):
+    """Print the median time of every benchmark of a size."""
+    print(f"{size} ({size_results['corpus']['bytes']} bytes)")
+    for name, timing in flatten_results({"results": {size: size_results}}).items():
+        print(f"  {name.split('/', 1)[1]:<40}{timing['median'] * 1000:>10.3f} ms")
+    if "error" in size_results.get("ui", {}):
+        print(f"  ui skipped: {size_results['ui']['error']}")
+
+
+def compare_results(old_path:str, new_path:str):
+    """Print the change in median time between two saved results."""
+    with open(old_path, "r", encoding="utf-8") as file:
+        old = flatten_results(json.load(file))
+    with open(new_path, "r", encoding="utf-8") as file:
+        new = flatten_results(json.load(file))
+
+    for name in sorted(old.keys() & new.keys()):
+        old_time = old[name]["median"]
+        new_time = new[name]["median"]
+        ratio = new_time / old_time if old_time else float("inf")
+        print(f"{name:<50}{old_time * 1000:>10.3f} ms{new_time * 1000:>10.3f} ms"
+              f"{ratio:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Review Toolkit.")
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-ui", action="store_true", help="Skip the UI benchmarks.")
+    parser.add_argument("--output", help="The JSON file to save the results to.")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="Compare two saved results instead of running.")
+    arguments = parser.parse_args()
+
+    if arguments.compare:
+        compare_results(*arguments.compare)
+    else:
+        benchmark_results = run_benchmarks(arguments.sizes,
+                                           arguments.repeat,
+                                           not arguments.no_ui)
+        output = arguments.output or os.path.join(
+            "benchmarks", "results", f"{benchmark_results['meta']['commit']}.json"
+            )
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(benchmark_results, file, indent=4)
+        print(f"Saved results to {output}")
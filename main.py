@@ -5,15 +5,27 @@ This script sets the current working directory to the directory containing
 the script, then creates an instance of the WindowManager class from the 
 modules.window_manager module.
 
+When arguments are given, the command line interface of utils.cli runs
+instead and the GUI modules are never imported.
+
 Usage:
     Run this script to start the application.
+    Run it with arguments to read review files from the command line:
+        python main.py show data/general.txt -c 1A
 """
 
 import os
 import json
-from modules.window_manager import WindowManager
+import sys
+import time
 
 if __name__ == "__main__":
+    started = time.perf_counter()   # Start of the startup profile.
+    if len(sys.argv) > 1:
+        # Paths are relative to the caller, the working directory is kept.
+        from utils.cli import main
+        sys.exit(main(directory=os.path.join(os.path.dirname(__file__) or ".", "data")))
+
     # Set directory to working directory.
     os.chdir(os.path.dirname(__file__))
 
@@ -27,9 +39,14 @@ if __name__ == "__main__":
         config_data = {
             "default_active_directory": "data",
             "default_side_data": "data/buttons.txt",
-            "default_body_data": "data/general.txt"
+            "default_body_data": "data/general.txt",
+            "lazy_loading": False,
+            "metrics_enabled": False,
+            "clipboard_backend": "tk",
+            "parser": "buffer"
         }
         with open(config_file_path, "w", encoding="utf-8") as config_file:
             json.dump(config_data, config_file, indent=4)
 
-    app = WindowManager(config_data)
+    from modules.window_manager import WindowManager
+    app = WindowManager(config_data, started)
@@ -3,6 +3,8 @@
 This module contains the BodyFrame class, which is responsible for setting up
 the body frame in the main application window. The body frame contains a
 notebook with tabs, each tab containing a scrollable canvas with checkboxes.
+The checked boxes and the selected tab of every file are recorded in a
+SessionJournal when one is given, and restored when the file is shown again.
 
 Classes:
     BodyFrame: Manages the body frame setup and flow.
@@ -17,17 +19,26 @@ Usage:
 import os
 import tkinter as tk
 from tkinter import ttk
-from pyperclip import copy
-from utils.load_data import load_task_data
+from modules.checkbox_list import CheckboxList
+from utils import metrics
+from utils.clipboard import Clipboard
+from utils.layout import LayoutManager
+from utils.template import fill_templates
 
 
 class BodyFrame:
     """Manages the body frame setup and flow."""
-    def __init__(self, root, data, directory, position: tuple):
+    def __init__(self, root, data, directory, position: tuple, clipboard=None, variables=None,
+                 journal=None):
         self.root = root
         self.data = data
         self.directory = directory # Link to create_body_frame to open correct file
         self.position = position
+        self.clipboard = clipboard or Clipboard(self.root)
+        self.variables = {} if variables is None else variables # Fill placeholders.
+        self.journal = journal  # SessionJournal or None.
+        self.list_keys = {}     # {checkbox_list: (frame_index, heading)}
+        self.shown_directory = [None for _ in directory]  # File each frame last showed.
 
 
         # Create a Label with background color (For Debug purposes).
@@ -38,85 +49,60 @@ class BodyFrame:
                         columnspan=4,
                         sticky="nswe")
 
-        self.frames = ["", ""] # max 3 elements
+        self.frames = [None, None] # max 3 elements
+        self.tab_pools = [[] for _ in self.frames] # Released (tab, checkbox_list)
+        self.tab_areas = [(1, 1) for _ in self.frames] # Room of the lists of each frame.
+
+        # The lists are fitted into their tabs once a resize has settled.
+        self.layout = LayoutManager(self.root)
+        self.layout.watch(self.root, self.apply_layout)
+
+        # One dispatcher for the mouse wheel of every checkbox list.
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.root.bind_all(sequence, self.scroll_on_mousewheel)
+
         self.load_frame()
 
 
     def load_frame(self):
         """
         Load the top and bottom frames.
-        Destroy all widgets before reloading.
+        Only tabs whose data changed are updated, tabs that are no longer
+        needed are kept in a pool to be reused by later loads.
         """
-        for i, frame in enumerate(self.frames):
-            for element in frame[:]:
-                if isinstance(element, dict):
-                    for tab, widgets in element.items():
-                        for widget in widgets:
-                            widget[0].destroy()
-                        tab.destroy()
-                else:
-                    element.destroy()
-
-            self.frames[i] = (
-                self.create_body_frame(self.label, self.data[i], self.directory[i], i)
-            )
-
-
-    def create_body_frame(self, root, data, directory, frame_index):
+        with metrics.span("BodyFrame.load_frame") as timing:
+            for i, frame in enumerate(self.frames):
+                if frame is None:
+                    self.frames[i] = self.create_body_frame(self.label, i)
+                self.update_tabs(i)
+            if timing:
+                timing.set(tabs=sum(len(data) for data in self.data))
+
+
+    @metrics.timed("BodyFrame.create_body_frame")
+    def create_body_frame(self, root, frame_index):
         """Create a body frame"""
         body_frame = tk.Frame(root, highlightthickness=0)
         body_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, anchor="n")
+        self.layout.watch(body_frame, self.apply_layout)
 
-        # Create the notebook.
+        # Create the notebook, tab contents are built when first selected.
+        # It fills the frame, so its tabs follow the size of the window.
         notebook = ttk.Notebook(body_frame)
-        notebook.pack()
-
-        # Dimensions of canvas.
-        # Note that - 80 and - 30 - 80 * len()) / len() are magic values.
-        body_frame.update_idletasks()   # Ensure updated winfo is obtained.
-        width = self.root.winfo_width() - 80
-        height = (self.root.winfo_height() - 30 - 80 * len(self.frames)) / len(self.frames)
-
-        widgets = {}    # {tab: [label, ...], ...}
-        canvas_and_inner_frame = {} # {body_frame: (canvas, inner_frame), ...}  <--- Looks inefficient
-
-        for heading, content in data.items():
-            # Create the tabs in the notebook.
-            tab = tk.Frame(notebook, highlightthickness=0)
-            text = f"{heading[:4]}..." if len(heading) > 4 else heading
-            notebook.add(tab, text=text)
-
-            # Create a canvas with inner_frame for scrollbar.
-            canvas, inner_frame = self.create_scrollable_canvas(
-                tab, width, height
-                )
-
-            canvas_and_inner_frame[body_frame] = (canvas, inner_frame)
-
-            # Create checkboxes.
-            checkboxes = []
-            for text in content:
-                var = tk.BooleanVar()
-                label = tk.Checkbutton(inner_frame, text=text[0], variable=var)
-                checkboxes.append((label, var))
-                label.pack(side="top", anchor="nw")
-            widgets[tab] = checkboxes
-
-            # Make each canvas scrollable.
-            inner_frame.bind(
-                "<Configure>",
-                lambda event,
-                canvas=canvas_and_inner_frame[body_frame][0]: self.enable_scroll(
-                    event,
-                    canvas
-                    ))
-            inner_frame.bind_all("<MouseWheel>", self.scroll_on_mousewheel)
+        notebook.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        notebook.bind("<<NotebookTabChanged>>",
+                      lambda event, frame_index=frame_index: self.on_tab_changed(
+                          frame_index,
+                          event
+                          ))
 
         # Create button for opening task file.
         button = ttk.Button(body_frame,
                             text="Open",
                             width=5,
-                            command=lambda directory=directory: self.open_file(directory))
+                            command=lambda frame_index=frame_index: self.open_file(
+                                self.directory[frame_index]
+                                ))
         button.pack(side="right", anchor="ne")
 
         # Create button for copying selected boxes.
@@ -126,59 +112,202 @@ class BodyFrame:
                             command=lambda frame_index=frame_index: self.copy_to_clipboard(frame_index))
         button.pack(side="right", anchor="ne")
 
+        widgets = {}    # {tab: checkbox_list or None if not built yet, ...}
+        headings = {}   # {heading: tab, ...}
+        contents = {}   # {tab: [(label, text), ...], ...}
+
         # Returns all widgets created in the method.
-        return (inner_frame, canvas, notebook, body_frame, widgets)
+        return (notebook, body_frame, widgets, headings, contents)
 
 
-    def create_scrollable_canvas(self, parent, width, height):
-        """Create a scrollable canvas."""
-        canvas = tk.Canvas(parent,
-                           width=width,
-                           height=height,
-                           highlightthickness=0)
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    def update_tabs(self, frame_index):
+        """
+        Update the tabs of a body frame to match its data.
 
-        scrollbar = tk.Scrollbar(parent, command=canvas.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        Unchanged tabs are left alone, changed tabs are patched in place and
+        new tabs are taken from the pool before new widgets are created. Only
+        the selected tab is built, other tabs are built when first selected.
+        When another file is shown, the checked boxes are restored from the
+        journal instead of being kept.
+        """
+        notebook, _, widgets, headings, contents = self.frames[frame_index]
+        old_widgets = dict(widgets)
+        old_headings = dict(headings)
+        widgets.clear()
+        headings.clear()
+        contents.clear()
+        same_file = self.shown_directory[frame_index] == self.directory[frame_index]
+        self.shown_directory[frame_index] = self.directory[frame_index]
+
+        for position, (heading, content) in enumerate(self.data[frame_index].items()):
+            tab = old_headings.pop(heading, None)
+            if tab is None:
+                tab, checkbox_list = self.acquire_tab(frame_index)
+            else:
+                checkbox_list = old_widgets[tab]
+                if checkbox_list is not None and not same_file:
+                    checkbox_list.set_items(content, keep_checked=False)
+                    self.restore_checked(frame_index, heading, checkbox_list)
+                elif checkbox_list is not None and checkbox_list.items is not content:
+                    if list(checkbox_list.items) == list(content):
+                        # Keep the displayed items, nothing needs rebuilding.
+                        content = checkbox_list.items
+                    else:
+                        checkbox_list.set_items(content)
+
+            # Add new tabs, then move every tab to its position.
+            text = f"{heading[:4]}..." if len(heading) > 4 else heading
+            if tab not in old_widgets:
+                notebook.add(tab, text=text)
+            notebook.insert(position, tab, text=text)
 
-        canvas.configure(yscrollcommand=scrollbar.set)
+            widgets[tab] = checkbox_list
+            headings[heading] = tab
+            contents[tab] = content
 
-        inner_frame = tk.Frame(canvas)
-        canvas.create_window((0, 0), window=inner_frame, anchor=tk.NW)
-        return canvas, inner_frame
+        # Return tabs that are no longer needed to the pool.
+        for tab in old_headings.values():
+            notebook.forget(tab)
+            if old_widgets[tab] is not None:
+                old_widgets[tab].clear()
+            self.tab_pools[frame_index].append((tab, old_widgets[tab]))
 
+        # Select the tab that was selected the last time the file was shown.
+        if self.journal is not None:
+            selected = self.journal.selected_tab(frame_index, self.directory[frame_index])
+            if selected in headings and notebook.select() != str(headings[selected]):
+                notebook.select(headings[selected])
 
-    def enable_scroll(self, event, canvas):
-        """Enables scroll."""
-        canvas.configure(scrollregion=canvas.bbox("all"))
+        if notebook.select():
+            self.materialize_tab(frame_index, notebook.nametowidget(notebook.select()))
 
 
-    def get_canvas(self, widget_name):
-        """Get the canvas widget that a given widget is on."""
-        widget = self.root.nametowidget(widget_name)
-        parent = widget
+    def acquire_tab(self, frame_index):
+        """
+        Return a (tab, checkbox_list) from the pool, or a new tab whose
+        checkbox_list is None. Either is filled when the tab is materialized.
+        """
+        if self.tab_pools[frame_index]:
+            return self.tab_pools[frame_index].pop()
 
-        # Cycles through the widget that was scrolled on to determine if
-        # it lies on a canvas.
-        while parent:
-            parent = self.root.nametowidget(parent)
-            if isinstance(parent, tk.Canvas):
-                return parent
+        return tk.Frame(self.frames[frame_index][0], highlightthickness=0), None
 
-            # Cycle up the layer of widgets.
-            parent = parent.winfo_parent()
 
-        # If mouse scroll did not occur on a widget that lies on a
-        # canvas.
+    def materialize_tab(self, frame_index, tab):
+        """
+        Create the checkbox list of a tab if it has not been built yet, or
+        fill a list reused from the pool with the content of the tab.
+        """
+        _, _, widgets, _, contents = self.frames[frame_index]
+        if tab not in widgets:
+            return
+
+        if widgets[tab] is not None:
+            if widgets[tab].items is not contents[tab]:
+                # Lists from the pool may have been sized for an older window.
+                widgets[tab].fit(*self.tab_areas[frame_index])
+                widgets[tab].set_items(contents[tab], keep_checked=False)
+                self.restore_checked(frame_index, self.get_heading(frame_index, tab), widgets[tab])
+            return
+
+        # Create a virtualized list of checkboxes on a scrollable canvas, the
+        # size of the tab is used until the canvas is drawn and fills it.
+        with metrics.span("BodyFrame.materialize_tab", checkboxes=len(contents[tab])):
+            checkbox_list = CheckboxList(tab, contents[tab], 1, 1,
+                                         on_toggle=self.on_checkbox_toggled,
+                                         layout=self.layout)
+            checkbox_list.fit(*self.tab_areas[frame_index])
+        widgets[tab] = checkbox_list
+        self.restore_checked(frame_index, self.get_heading(frame_index, tab), checkbox_list)
+
+
+    def apply_layout(self):
+        """
+        Fit the built lists into their tabs after the window or a frame was
+        resized. Lists are resized in place, no widget is rebuilt.
+        """
+        with metrics.span("BodyFrame.apply_layout"):
+            for frame_index, frame in enumerate(self.frames):
+                if frame is None or not frame[0].select():
+                    continue
+                notebook, _, widgets, _, _ = frame
+                tab = notebook.nametowidget(notebook.select())
+                if not tab.winfo_ismapped():
+                    continue
+                # Every tab of a notebook has the size of the selected one.
+                self.tab_areas[frame_index] = (tab.winfo_width(), tab.winfo_height())
+                for checkbox_list in widgets.values():
+                    if checkbox_list is not None:
+                        checkbox_list.fit(*self.tab_areas[frame_index])
+
+
+    def get_heading(self, frame_index, tab):
+        """Return the heading of a tab, or None if it is not shown."""
+        for heading, heading_tab in self.frames[frame_index][3].items():
+            if heading_tab is tab:
+                return heading
         return None
 
 
+    def restore_checked(self, frame_index, heading, checkbox_list):
+        """Check the boxes of a tab that the journal recorded as checked."""
+        self.list_keys[checkbox_list] = (frame_index, heading)
+        if self.journal is not None:
+            checkbox_list.check_labels(self.journal.checked_labels(
+                frame_index, self.directory[frame_index], heading
+                ))
+
+
+    def on_checkbox_toggled(self, checkbox_list, index, checked):
+        """Record a checkbox that was checked or unchecked."""
+        frame_index, heading = self.list_keys.get(checkbox_list, (None, None))
+        if self.journal is not None and heading is not None:
+            self.journal.record_check(frame_index,
+                                      self.directory[frame_index],
+                                      heading,
+                                      checkbox_list.items[index][0],
+                                      checked)
+
+
+    def on_tab_changed(self, frame_index, event=None):
+        """Build the selected tab, then its neighbours when idle."""
+        notebook = self.frames[frame_index][0]
+        if not notebook.select():
+            return
+        tab = notebook.nametowidget(notebook.select())
+        self.materialize_tab(frame_index, tab)
+        heading = self.get_heading(frame_index, tab)
+        if self.journal is not None and heading is not None:
+            self.journal.record_select(frame_index, self.directory[frame_index], heading)
+
+        # Prefetch the neighbouring tabs one at a time.
+        tabs = notebook.tabs()
+        index = notebook.index(tab)
+        for neighbour in (index + 1, index - 1):
+            if 0 <= neighbour < len(tabs):
+                self.root.after_idle(self.materialize_tab,
+                                     frame_index,
+                                     notebook.nametowidget(tabs[neighbour]))
+
+
+    def show_checkbox(self, frame_index, heading, checkbox_index):
+        """Select the tab with the given heading and scroll to a checkbox."""
+        notebook, _, widgets, headings, _ = self.frames[frame_index]
+        tab = headings.get(heading)
+        if tab is None:
+            return
+
+        notebook.select(tab)
+        self.materialize_tab(frame_index, tab)
+        if checkbox_index >= 0:
+            widgets[tab].see(checkbox_index)
+
+
     def scroll_on_mousewheel(self, event):
-        """Scroll the canvas."""
-        canvas_widget = self.get_canvas(event.widget)
-        if canvas_widget:
-            if canvas_widget.winfo_height() < canvas_widget.bbox("all")[3]:
-                canvas_widget.yview_scroll(-1 * (event.delta // 120), "units")
+        """Scroll the checkbox list the mouse is over."""
+        checkbox_list = CheckboxList.registry.get(str(event.widget))
+        if checkbox_list is not None:
+            checkbox_list.scroll_wheel(event)
 
 
     def open_file(self, directory, event=None):
@@ -189,17 +318,19 @@ class BodyFrame:
     # FIX ####################################################################################
     def copy_to_clipboard(self, frame_index, event=None):
         """Copy data of selected checkboxes to clipboard"""
-        selected_tab_frame = self.frames[frame_index][2].select()
-        selected_tab_index = self.frames[frame_index][2].index(selected_tab_frame)
-        selected_tab_key = list(self.frames[frame_index][4].keys())[selected_tab_index]
-        selected_tab_text = [value for _, value in self.data[frame_index].items()][selected_tab_index]
-        selected_tab = self.frames[frame_index][4][selected_tab_key]
-
-        text = []
-        for i, _checkbox in enumerate(selected_tab):
-            if _checkbox[1].get():
-                text.append(selected_tab_text[i][1])
-                _checkbox[1].set(False)
-
-        text = "\n".join(text)
-        copy(text)
+        notebook = self.frames[frame_index][0]
+        selected_tab = notebook.nametowidget(notebook.select())
+        self.materialize_tab(frame_index, selected_tab)
+        checkbox_list = self.frames[frame_index][2][selected_tab]
+
+        # Read the model rather than the widgets, as rows that are
+        # scrolled out of view have no widget. The templates of a tab
+        # are compiled once, filling them only joins their parts.
+        text = fill_templates(checkbox_list.items, checkbox_list.selected(), self.variables)
+        checkbox_list.clear()
+        if self.journal is not None:
+            self.journal.record_clear(frame_index,
+                                      self.directory[frame_index],
+                                      self.get_heading(frame_index, selected_tab))
+
+        self.clipboard.copy(text)
@@ -0,0 +1,302 @@
+"""Manages a virtualized, scrollable list of checkboxes.
+
+This module contains the CheckboxList class, which displays a list of
+checkboxes on a scrollable canvas. Only the rows that are visible, plus a
+small overscan above and below, exist as live widgets. The widgets are
+recycled as the canvas scrolls, while the checked state of every row is kept
+in a compact model outside of the widgets.
+
+Classes:
+    CheckboxList: Manages a virtualized, scrollable list of checkboxes.
+
+Usage:
+    Create an instance of the CheckboxList class with a parent widget and a
+    sequence of (label, text) tuples to display a checkbox for every item.
+"""
+
+import tkinter as tk
+from utils.animation import Animation, ease_out_cubic
+
+
+class CheckboxList:
+    """Manages a virtualized, scrollable list of checkboxes."""
+    OVERSCAN = 4
+    """The number of rows kept alive above and below the visible rows."""
+
+    WHEEL_ROWS = 3
+    """The number of rows scrolled by one notch of the mouse wheel."""
+
+    SCROLL_DURATION = 0.12
+    """The time in seconds a mouse wheel scroll is animated over."""
+
+    registry = {}
+    """Maps the path of every canvas and row widget to its list."""
+
+    def __init__(self, parent, items, width, height, on_toggle=None, layout=None):
+        self.parent = parent
+        self.items = items  # [(label, text), ...]
+        self.checked = bytearray(len(items))    # 1 if the item is checked.
+        self.on_toggle = on_toggle  # Called with (list, index, checked).
+        self.layout = layout        # LayoutManager debouncing resizes, or None.
+        self.drawn = False          # True once the canvas has its real size.
+
+        # Create a canvas with a scrollbar. The scrollbar is packed first so
+        # that it keeps its place when the canvas asks for more room than
+        # there is, the canvas fills whatever is left.
+        self.canvas = tk.Canvas(parent,
+                                width=width,
+                                height=height,
+                                highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(parent, command=self.canvas.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Live rows, item index i is always displayed by rows[i % len(rows)].
+        self.rows = []          # [(checkbutton, var, window), ...]
+        self.row_items = []     # Item index displayed by each row.
+        self.row_height = self.measure_row_height()
+
+        self.canvas.configure(yscrollcommand=self.on_scroll,
+                              yscrollincrement=self.row_height)
+        self.canvas.bind("<Configure>", self.on_configure)
+        self.registry[str(self.canvas)] = self
+
+        # Mouse wheel deltas are 120 per notch except on macOS.
+        self.wheel_divisor = 120
+        if self.canvas.tk.call("tk", "windowingsystem") == "aqua":
+            self.wheel_divisor = 1
+        self.scroll_target = 0
+        self.scroll_animation = Animation(self.canvas,
+                                          self.move_to,
+                                          duration=self.SCROLL_DURATION,
+                                          easing=ease_out_cubic)
+
+        self.update_scroll_region()
+        self.refresh()
+
+
+    def measure_row_height(self):
+        """Returns the height of a single checkbox row in pixels."""
+        checkbutton = tk.Checkbutton(self.canvas, text="Ag")
+        height = max(checkbutton.winfo_reqheight(), 1)
+        checkbutton.destroy()
+        return height
+
+
+    def update_scroll_region(self):
+        """Sets the scroll region to the height of every row combined."""
+        self.canvas.configure(
+            scrollregion=(0, 0, 0, len(self.items) * self.row_height)
+            )
+
+
+    def content_height(self):
+        """Returns the height of every row combined in pixels."""
+        return len(self.items) * self.row_height
+
+
+    def visible_height(self):
+        """Returns the height of the visible area of the canvas."""
+        height = self.canvas.winfo_height()
+        if height <= 1:
+            # The canvas has not been mapped yet.
+            height = int(float(self.canvas.cget("height")))
+        return height
+
+
+    def on_configure(self, event=None):
+        """
+        Fills the canvas with rows after it was resized. The first size is
+        applied at once, later resizes once they settled.
+        """
+        if self.layout is None or not self.drawn:
+            self.drawn = True
+            self.refresh()
+        else:
+            self.layout.schedule(self.refresh)
+
+
+    def fit(self, width, height):
+        """
+        Fits the canvas and its scrollbar into an area of width x height,
+        reusing the existing rows.
+        """
+        width -= self.scrollbar.winfo_reqwidth()
+        self.canvas.configure(width=max(width, 1), height=max(height, 1))
+        self.update_scroll_region()
+        self.refresh()
+
+
+    def on_scroll(self, first, last):
+        """Updates the scrollbar and the live rows after the view moved."""
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+
+    def refresh(self, event=None):
+        """Binds the live rows to the items that are currently visible."""
+        if not self.items:
+            return
+
+        visible_rows = self.visible_height() // self.row_height + 1
+        self.ensure_row_count(min(visible_rows + 2 * self.OVERSCAN,
+                                  len(self.items)))
+
+        top = int(self.canvas.canvasy(0)) // self.row_height
+        start = max(top - self.OVERSCAN, 0)
+        end = min(start + len(self.rows), len(self.items))
+        start = max(end - len(self.rows), 0)
+
+        for index in range(start, end):
+            slot = index % len(self.rows)
+            if self.row_items[slot] != index:
+                self.bind_row(slot, index)
+
+
+    def ensure_row_count(self, count):
+        """Creates live rows until there are count of them."""
+        if count <= len(self.rows):
+            return
+
+        for slot in range(len(self.rows), count):
+            var = tk.BooleanVar()
+            checkbutton = tk.Checkbutton(
+                self.canvas,
+                variable=var,
+                anchor="w",
+                command=lambda slot=slot: self.toggle(slot)
+                )
+            window = self.canvas.create_window(0, 0, window=checkbutton, anchor=tk.NW)
+            self.rows.append((checkbutton, var, window))
+            self.registry[str(checkbutton)] = self
+
+        # The mapping of items to rows depends on the number of rows.
+        self.row_items = [-1] * len(self.rows)
+
+
+    def bind_row(self, slot, index):
+        """Displays the item at index in the row at slot."""
+        checkbutton, var, window = self.rows[slot]
+        checkbutton.configure(text=self.items[index][0])
+        var.set(bool(self.checked[index]))
+        self.canvas.coords(window, 0, index * self.row_height)
+        self.canvas.itemconfigure(window, state="normal")
+        self.row_items[slot] = index
+
+
+    def set_items(self, items, keep_checked=True):
+        """
+        Replaces the displayed items, reusing the existing rows.
+
+        Args:
+        - items (list): The new (label, text) tuples to display.
+        - keep_checked (bool): Keep items checked if an item with the same
+          label was checked before.
+        """
+        checked_labels = set()
+        if keep_checked:
+            checked_labels = {self.items[index][0] for index in self.selected()}
+
+        self.items = items
+        self.checked = bytearray(len(items))
+        for index, item in enumerate(items if checked_labels else ()):
+            if item[0] in checked_labels:
+                self.checked[index] = 1
+
+        # Hide every row, refresh shows the rows that are still needed.
+        for _, _, window in self.rows:
+            self.canvas.itemconfigure(window, state="hidden")
+        self.row_items = [-1] * len(self.rows)
+
+        self.scroll_animation.stop()
+        self.canvas.yview_moveto(0)
+        self.update_scroll_region()
+        self.refresh()
+
+
+    def scroll_wheel(self, event):
+        """Scrolls the list by the pixels a mouse wheel event represents."""
+        if event.num == 4:
+            notches = 1.0
+        elif event.num == 5:
+            notches = -1.0
+        else:
+            notches = event.delta / self.wheel_divisor
+        self.scroll_pixels(-notches * self.WHEEL_ROWS * self.row_height)
+
+
+    def scroll_pixels(self, pixels):
+        """Smoothly scrolls the list by a number of pixels."""
+        max_top = self.content_height() - self.visible_height()
+        if max_top <= 0:
+            return
+
+        # Continue from the running scroll so that fast wheel turns add up.
+        if self.scroll_animation.running:
+            start = self.scroll_animation.value
+            target = self.scroll_target + pixels
+        else:
+            start = self.canvas.canvasy(0)
+            target = start + pixels
+        self.scroll_target = min(max(target, 0), max_top)
+        self.scroll_animation.start(start, self.scroll_target)
+
+
+    def move_to(self, top):
+        """Scrolls the list so that the pixel at top is at the top."""
+        self.canvas.yview_moveto(top / self.content_height())
+
+
+    def toggle(self, slot):
+        """Stores the state of the row at slot in the checked model."""
+        index = self.row_items[slot]
+        if index >= 0:
+            self.checked[index] = self.rows[slot][1].get()
+            if self.on_toggle is not None:
+                self.on_toggle(self, index, bool(self.checked[index]))
+
+
+    def see(self, index):
+        """Scroll the item at index to the top and focus its checkbox."""
+        if not 0 <= index < len(self.items):
+            return
+        self.canvas.yview_moveto(index * self.row_height / self.content_height())
+        self.refresh()
+
+        slot = index % len(self.rows)
+        if self.row_items[slot] == index:
+            self.rows[slot][0].focus_set()
+
+
+    def check_labels(self, labels):
+        """Checks the items whose label is in labels."""
+        if not labels:
+            return
+        for index, item in enumerate(self.items):
+            if item[0] in labels:
+                self.checked[index] = 1
+        for slot, index in enumerate(self.row_items):
+            if index >= 0:
+                self.rows[slot][1].set(bool(self.checked[index]))
+
+
+    def selected(self):
+        """Returns the indices of all checked items."""
+        return [index for index, checked in enumerate(self.checked) if checked]
+
+
+    def clear(self):
+        """Unchecks every item."""
+        self.checked = bytearray(len(self.items))
+        for _, var, _ in self.rows:
+            var.set(False)
+
+
+    def destroy(self):
+        """Destroys every widget of the list."""
+        self.scroll_animation.stop()
+        self.registry.pop(str(self.canvas), None)
+        for checkbutton, _, _ in self.rows:
+            self.registry.pop(str(checkbutton), None)
+        self.canvas.destroy()
+        self.scrollbar.destroy()
@@ -0,0 +1,119 @@
+"""Manages the debug overlay setup and flow.
+
+This module contains the DebugOverlay class, which is responsible for setting
+up a popup showing the timing spans recorded by utils.metrics. The popup
+lists the latest spans and a summary per operation, along with counters such
+as the hits and misses of a cache, refreshes itself while open and can export
+the recorded spans to a JSON lines file.
+
+Classes:
+    DebugOverlay: Manages the debug overlay setup and flow.
+
+Usage:
+    Create an instance of the DebugOverlay class with the Tk root, then call
+    toggle to open or close it. Spans are only shown while metrics.enable
+    has been called.
+"""
+
+# pylint: disable=unused-argument
+
+import os
+import tkinter as tk
+from tkinter import ttk
+from utils import metrics
+from utils.constants import METRICS_FILE
+
+
+class DebugOverlay:
+    """Manages the debug overlay setup and flow."""
+    REFRESH_INTERVAL = 500
+    """The time in milliseconds between two refreshes of the overlay."""
+
+    RECENT_SPANS = 20
+    """The number of latest spans listed below the summary."""
+
+    def __init__(self, root, stats:dict=None, export_path:str=METRICS_FILE):
+        self.root = root
+        self.stats = stats or {}    # {title: callable returning a dict}
+        self.export_path = export_path
+        self.window = None
+        self.text = None
+        self.after_id = None
+
+
+    def toggle(self, event=None):
+        """Open the overlay, or close it if it is already open."""
+        if self.window is None:
+            self.show()
+        else:
+            self.hide()
+
+
+    def show(self):
+        """Open the overlay and start refreshing it."""
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Timings")
+        self.window.attributes("-topmost", True)
+        self.window.geometry(f"520x360+{max(self.root.winfo_x() - 530, 0)}+"
+                             f"{self.root.winfo_y()}")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        self.text = tk.Text(self.window, font=("Courier", 9), wrap="none")
+        self.text.pack(side="top", fill="both", expand=True)
+
+        button = ttk.Button(self.window, text="Export", command=self.export)
+        button.pack(side="right")
+        button = ttk.Button(self.window, text="Clear", command=metrics.clear)
+        button.pack(side="right")
+        self.refresh()
+
+
+    def hide(self, event=None):
+        """Close the overlay."""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+
+    def refresh(self):
+        """Show the current spans, then schedule the next refresh."""
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, self.format_spans())
+        self.after_id = self.root.after(self.REFRESH_INTERVAL, self.refresh)
+
+
+    def format_spans(self) -> str:
+        """Return the counters, the summary and the latest spans as text."""
+        lines = []
+        for title, stats in self.stats.items():
+            lines.append(f"{title}: " + " ".join(f"{key}={value}"
+                                                 for key, value in stats().items()))
+        if lines:
+            lines.append("")
+
+        if not metrics.is_enabled():
+            lines.append("Timing is off, set \"metrics_enabled\" in the config or "
+                         "REVIEW_TOOLKIT_METRICS=1.")
+            return "\n".join(lines)
+
+        lines.append(f"{'name':<32}{'count':>6}{'mean ms':>10}{'max ms':>10}")
+        for name, summary in sorted(metrics.summarize().items()):
+            lines.append(f"{name:<32}{summary['count']:>6}"
+                         f"{summary['mean'] * 1000:>10.2f}{summary['max'] * 1000:>10.2f}")
+
+        lines.append("")
+        for record in metrics.get_records()[-self.RECENT_SPANS:]:
+            fields = " ".join(f"{key}={value}" for key, value in record.items()
+                              if key not in ("name", "duration", "time", "thread"))
+            lines.append(f"{record['duration'] * 1000:>9.2f} ms  {record['name']}  {fields}")
+        return "\n".join(lines)
+
+
+    def export(self, event=None):
+        """Append the recorded spans to the export file."""
+        os.makedirs(os.path.dirname(self.export_path) or ".", exist_ok=True)
+        count = metrics.export_jsonl(self.export_path)
+        self.window.title(f"Timings - exported {count} spans")
@@ -2,7 +2,7 @@
 
 This module contains the FooterFrame class, which is responsible for setting up
 the footer frame in the main application window. The footer frame contains a
-button for opening the data folder.
+button for opening the data folder and a button for the variables popup.
 
 Classes:
     FooterFrame: Manages the footer frame setup and flow.
@@ -19,9 +19,10 @@ from tkinter import ttk
 
 class FooterFrame:
     """Manages the footer frame setup and flow."""
-    def __init__(self, root, data, position:tuple):
+    def __init__(self, root, data, position:tuple, variables_command=None):
         self.root = root
         self.data = data
+        self.variables_command = variables_command
 
         # Create a Label with background color (For Debug purposes).
         self.label = tk.Label(self.root, background='black')
@@ -30,6 +31,8 @@ class FooterFrame:
         style.configure("footer_frame.TButton", background="black")
 
         self.open_folder_button = self.create_open_folder_button()
+        if self.variables_command is not None:
+            self.variables_button = self.create_variables_button()
 
     def create_open_folder_button(self):
         """Create a button for opening the data folder."""
@@ -42,6 +45,17 @@ class FooterFrame:
         return button
 
 
+    def create_variables_button(self):
+        """Create a button for opening the variables popup."""
+        button = ttk.Button(self.label,
+                            text="Variables",
+                            width=9,
+                            style="footer_frame.TButton",
+                            command=self.variables_command)
+        button.pack(side="right", anchor="e")
+        return button
+
+
     def open_folder(self, event=None):
         """Open the data folder"""
         data_directory = fr"{os.getcwd()}\data"
@@ -15,15 +15,36 @@ Usage:
 
 import tkinter as tk
 from tkinter import ttk
+from utils.animation import Animation
+from utils.background import BackgroundLoader
+from utils.constants import REVIEW_SOURCE_DIRECTORY
+from utils.path_index import PathIndex
+
+SLIDE_DURATION = 0.25
+"""The time in seconds it takes to show or hide the window."""
+
+DRAG_FRAME_INTERVAL = 16
+"""The time in milliseconds between two moves of a dragged window."""
+
 
 class HeaderFrame:
     """Manages the header frame setup and flow."""
-    def __init__(self, root, position:tuple):
+    def __init__(self, root, position:tuple, search_command=None,
+                 active_directory=REVIEW_SOURCE_DIRECTORY):
         self.root = root
+        self.search_command = search_command
         self.geometry = root.geometry() # Store geometry for show/hide button.
         self.position = position
         self.selected_directory = ""
         self.hidden = False
+        self.drag = None    # Cached dimensions while the window is dragged.
+
+        # Time based animation used to show and hide the window.
+        self.slide_y = 0
+        self.slide = Animation(self.root,
+                               self.move_window,
+                               duration=SLIDE_DURATION,
+                               on_finish=self.finish_slide)
 
         # Create a Label with background color (For Debug purposes).
         self.label = tk.Frame(self.root, background='red')
@@ -37,7 +58,17 @@ class HeaderFrame:
         self.show_hide_button = self.create_show_hide_button()
         self.directory_field = self.create_directory_field()
         self.close_button = self.create_close_button()
-        
+        self.search_button = self.create_search_button()
+        self.loading_bar = self.create_loading_bar()
+
+        # Index of review files for completing the directory field.
+        self.path_index = PathIndex(active_directory)
+        self.path_loader = BackgroundLoader(self.root, max_workers=1)
+        self.completions = []
+        self.completion_window = None
+        self.completion_list = None
+        self.refresh_path_index()
+
 
     def create_show_hide_button(self):
         """Create a button for showing or hiding the window."""
@@ -48,7 +79,9 @@ class HeaderFrame:
                                       command=self.show_hide)
         show_hide_button.pack(side="left")
         # Enable user to drag the window by holding down the mouse button.
+        show_hide_button.bind("<ButtonPress-1>", self.start_drag)
         show_hide_button.bind("<B1-Motion>", self.drag_window)
+        show_hide_button.bind("<ButtonRelease-1>", self.end_drag)
         return show_hide_button
 
 
@@ -60,9 +93,106 @@ class HeaderFrame:
                                     style="header_frame.TEntry")
         directory_field.insert(0, "data\\")
         directory_field.bind("<Return>", self.get_directory)
+        directory_field.bind("<KeyRelease>", self.update_completions)
+        directory_field.bind("<Down>", lambda event: self.move_completion(1))
+        directory_field.bind("<Up>", lambda event: self.move_completion(-1))
+        directory_field.bind("<Tab>", self.accept_completion)
+        directory_field.bind("<Escape>", self.hide_completions)
+        directory_field.bind("<FocusIn>", self.refresh_path_index)
+        directory_field.bind("<FocusOut>",
+                             lambda event: self.root.after(150, self.hide_completions))
         directory_field.pack(side="left", padx=4)
         return directory_field
 
+
+    def refresh_path_index(self, event=None):
+        """Refresh the index of review files in the background."""
+        if not self.path_loader.busy:
+            self.path_loader.submit(self.path_index.refreshed,
+                                    callback=self.set_path_index)
+
+
+    def set_path_index(self, path_index):
+        """Replace the index of review files with a refreshed one."""
+        self.path_index = path_index
+
+
+    def update_completions(self, event=None):
+        """List the review files completing the text in the directory field."""
+        if event is not None and event.keysym in ("Return", "Tab", "Escape",
+                                                  "Up", "Down"):
+            return
+
+        self.completions = self.path_index.complete(self.directory_field.get())
+        if not self.completions:
+            self.hide_completions()
+            return
+
+        if self.completion_window is None:
+            self.create_completion_window()
+        self.completion_list.delete(0, tk.END)
+        for path in self.completions:
+            self.completion_list.insert(tk.END, path)
+        self.completion_list.configure(height=len(self.completions))
+
+        self.completion_window.geometry(
+            f"+{self.directory_field.winfo_rootx()}"
+            f"+{self.directory_field.winfo_rooty() + self.directory_field.winfo_height()}"
+            )
+        self.completion_window.deiconify()
+        self.completion_window.lift()
+
+
+    def create_completion_window(self):
+        """Create the dropdown listing completions of the directory field."""
+        self.completion_window = tk.Toplevel(self.root)
+        self.completion_window.overrideredirect(True)
+        self.completion_window.attributes("-topmost", True)
+        self.completion_list = tk.Listbox(self.completion_window,
+                                          activestyle="none",
+                                          exportselection=False)
+        self.completion_list.pack(fill=tk.BOTH, expand=True)
+        self.completion_list.bind("<ButtonRelease-1>", self.accept_completion)
+
+
+    def completions_shown(self):
+        """Returns True if the completion dropdown is visible."""
+        return (self.completion_window is not None
+                and self.completion_window.winfo_viewable())
+
+
+    def move_completion(self, step):
+        """Move the selection in the completion dropdown."""
+        if not self.completions_shown():
+            return "break"
+        selection = self.completion_list.curselection()
+        index = selection[0] + step if selection else (0 if step > 0 else -1)
+        index %= len(self.completions)
+        self.completion_list.selection_clear(0, tk.END)
+        self.completion_list.selection_set(index)
+        self.completion_list.see(index)
+        return "break"
+
+
+    def accept_completion(self, event=None):
+        """Replace the text in the directory field with the selected completion."""
+        if not self.completions_shown():
+            return None
+        selection = self.completion_list.curselection()
+        if selection:
+            self.directory_field.delete(0, tk.END)
+            self.directory_field.insert(0, self.completions[selection[0]])
+            self.directory_field.icursor(tk.END)
+        self.hide_completions()
+        self.directory_field.focus_set()
+        return "break"
+
+
+    def hide_completions(self, event=None):
+        """Hide the completion dropdown."""
+        if self.completion_window is not None:
+            self.completion_window.withdraw()
+
     def create_close_button(self):
         """Create a button for closing the application."""
         show_hide_button = ttk.Button(self.label,
@@ -74,64 +204,144 @@ class HeaderFrame:
         return show_hide_button
 
 
+    def create_search_button(self):
+        """Create a button for opening the search popup."""
+        search_button = ttk.Button(self.label,
+                                   text="Find",
+                                   width=5,
+                                   style="header_frame.TButton",
+                                   command=self.search_command)
+        if self.search_command is not None:
+            search_button.pack(side="right")
+        return search_button
+
+
+    def create_loading_bar(self):
+        """Create a progress bar that is shown while a file is loading."""
+        loading_bar = ttk.Progressbar(self.label,
+                                      mode="indeterminate",
+                                      length=40)
+        return loading_bar
+
+
+    def set_loading(self, loading:bool):
+        """Shows or hides the loading bar."""
+        if loading:
+            self.loading_bar.pack(side="left", padx=(0, 4))
+            self.loading_bar.start(15)
+        else:
+            self.loading_bar.stop()
+            self.loading_bar.pack_forget()
+
+
     def close_application(self, event=None):
         """Close the application, effectively ending this program"""
+        self.path_loader.shutdown()
         self.root.destroy()
 
 
+    def start_drag(self, event=None):
+        """
+        Caches the window and screen dimensions for the length of a drag,
+        so that motion events do not need to query them.
+        """
+        width = self.root.winfo_width()
+        height = self.root.winfo_height()
+        screen_width = self.root.winfo_screenwidth()
+        # The virtual root spans every monitor on multi-monitor setups.
+        vroot_y = self.root.winfo_vrooty()
+        vroot_height = self.root.winfo_vrootheight() or self.root.winfo_screenheight()
+
+        self.drag = {
+            "x_position": screen_width - width,
+            "min_y": vroot_y,
+            "max_y": max(vroot_y + vroot_height - height, vroot_y),
+            "y_position": None,     # Latest position not yet applied.
+            "after_id": None
+            }
+
+
     def drag_window(self, event=None):
         """
         Changes the y position of the window based on mouse position
-        if the window is not set hidden.
+        if the window is not set hidden. Motion events are coalesced so that
+        only the latest position is applied, once per frame.
         """
-        if not self.hidden:
-            width = self.root.winfo_width()
-            height = self.root.winfo_height()
-            screen_width = self.root.winfo_screenwidth()
-            x_position = screen_width - width
-            # Adjust the y position based on the mouse position
-            y_position = event.y_root
-            self.root.geometry(f"{width}x{height}+{x_position}+{y_position}")
+        if self.hidden or self.drag is None:
+            return
+
+        # Adjust the y position based on the mouse position
+        self.drag["y_position"] = min(max(event.y_root, self.drag["min_y"]),
+                                      self.drag["max_y"])
+        if self.drag["after_id"] is None:
+            self.drag["after_id"] = self.root.after(DRAG_FRAME_INTERVAL,
+                                                    self.apply_drag)
+
+
+    def apply_drag(self):
+        """Moves the window to the latest position of the drag."""
+        if self.drag is None:
+            return
+        self.drag["after_id"] = None
+        if self.drag["y_position"] is not None:
+            self.root.geometry(
+                f"+{self.drag['x_position']}+{self.drag['y_position']}"
+                )
+            self.drag["y_position"] = None
+
+
+    def end_drag(self, event=None):
+        """Applies the last position of a drag and stores the geometry."""
+        if self.drag is None:
+            return
+        if self.drag["after_id"] is not None:
+            self.root.after_cancel(self.drag["after_id"])
+        moved = self.drag["y_position"] is not None or self.drag["after_id"] is not None
+        self.apply_drag()
+        self.drag = None
+        if moved:
             self.geometry = self.root.geometry()
 
 
     def show_hide(self, event=None):
-        """Shows or hides the window."""
+        """
+        Shows or hides the window by sliding it along the screen edge.
+        Clicking again during a slide reverses it from where it is.
+        """
         self.hidden = not self.hidden
         # Get current dimensions of root window.
         width = self.root.winfo_width()
-        height = self.root.winfo_height()
         # Get the screen width.
         screen_width = self.root.winfo_screenwidth()
-        # Calculate the new x-coordinate to position the window at.
-        
-        # Temporary Brute force method to get window position to update.
-        if self.hidden:
-            x_position = screen_width - width
-            while x_position < screen_width - round(width/10):
-                # Calculate the new x-coordinate to position the window at.
-                x_position += 1
-                # Set the new geometry of the root window
-                self.root.geometry(
-                    f"{width}x{height}+{x_position}+{self.root.winfo_y()}"
-                    )
-                self.root.update_idletasks()  # Update the window immediately
+        # Calculate the x-coordinates of the shown and hidden window.
+        shown_x = screen_width - width
+        hidden_x = screen_width - round(width/10)
+
+        if self.slide.running:
+            start_x = self.slide.value
         else:
-            x_position = screen_width - round(width/10)
-            while x_position > screen_width - width:
-                # Calculate the new x-coordinate to position the window at.
-                x_position -= 1
-                # Set the new geometry of the root window
-                self.root.geometry(
-                    f"{width}x{height}+{x_position}+{self.root.winfo_y()}"
-                    )
-                self.root.update_idletasks()  # Update the window immediately
+            start_x = shown_x if self.hidden else hidden_x
+        end_x = hidden_x if self.hidden else shown_x
+
+        self.slide_y = self.root.winfo_y()
+        self.slide.start(start_x,
+                         end_x,
+                         abs(end_x - start_x) / max(hidden_x - shown_x, 1))
+
+
+    def move_window(self, x_position):
+        """Moves the window to x_position, used by the slide animation."""
+        self.root.geometry(f"+{x_position}+{self.slide_y}")
+
 
+    def finish_slide(self):
+        """Stores the geometry of the window once a slide has finished."""
         self.geometry = self.root.geometry()
 
 
     def get_directory(self, event=None):
         """Returns the text in the entry field"""
+        self.accept_completion()
         self.selected_directory = self.directory_field.get()
 
 
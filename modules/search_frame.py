@@ -0,0 +1,97 @@
+"""Manages the search popup setup and flow.
+
+This module contains the SearchFrame class, which is responsible for setting
+up a popup below the header with an entry field and a list of search
+results. Results are updated as the user types, and selecting a result jumps
+to the matching checkbox.
+
+Classes:
+    SearchFrame: Manages the search popup setup and flow.
+
+Usage:
+    Create an instance of the SearchFrame class with a search function and a
+    function to call with the selected hit, then call show to open it.
+"""
+
+# pylint: disable=unused-argument
+
+import os
+import tkinter as tk
+from tkinter import ttk
+
+
+class SearchFrame:
+    """Manages the search popup setup and flow."""
+    def __init__(self, root, search, on_select):
+        self.root = root
+        self.search = search        # query -> [(path, tab, index, label), ...]
+        self.on_select = on_select  # Called with the selected hit.
+        self.results = []
+        self.window = None
+        self.entry = None
+        self.listbox = None
+
+
+    def show(self, event=None):
+        """Open the popup, or focus it if it is already open."""
+        if self.window is None:
+            self.window = self.create_window()
+        self.window.geometry(
+            f"{self.root.winfo_width()}x200"
+            f"+{self.root.winfo_rootx()}+{self.root.winfo_rooty() + 30}"
+            )
+        self.window.deiconify()
+        self.window.lift()
+        self.entry.focus_set()
+        self.entry.select_range(0, tk.END)
+
+
+    def create_window(self):
+        """Create the popup window with an entry field and a result list."""
+        window = tk.Toplevel(self.root)
+        window.overrideredirect(True)
+        window.attributes("-topmost", True)
+
+        self.entry = ttk.Entry(window, cursor="ibeam")
+        self.entry.pack(side="top", fill=tk.X)
+        self.entry.bind("<KeyRelease>", self.update_results)
+        self.entry.bind("<Return>", self.select)
+        self.entry.bind("<Down>", lambda event: self.listbox.focus_set())
+        self.entry.bind("<Escape>", self.hide)
+
+        self.listbox = tk.Listbox(window, activestyle="dotbox")
+        self.listbox.pack(side="top", fill=tk.BOTH, expand=True)
+        self.listbox.bind("<Double-Button-1>", self.select)
+        self.listbox.bind("<Return>", self.select)
+        self.listbox.bind("<Escape>", self.hide)
+        return window
+
+
+    def update_results(self, event=None):
+        """Search for the text in the entry field and list the hits."""
+        if event is not None and event.keysym in ("Return", "Down", "Escape"):
+            return
+
+        self.results = self.search(self.entry.get())
+        self.listbox.delete(0, tk.END)
+        for path, tab_label, checkbox_index, label in self.results:
+            location = tab_label if checkbox_index < 0 else f"{tab_label} > {label}"
+            self.listbox.insert(tk.END, f"{os.path.basename(path)}: {location}")
+        if self.results:
+            self.listbox.selection_set(0)
+
+
+    def select(self, event=None):
+        """Jump to the selected hit, or the first hit if none is selected."""
+        if not self.results:
+            return
+        selection = self.listbox.curselection()
+        hit = self.results[selection[0] if selection else 0]
+        self.hide()
+        self.on_select(*hit)
+
+
+    def hide(self, event=None):
+        """Hide the popup."""
+        if self.window is not None:
+            self.window.withdraw()
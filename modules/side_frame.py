@@ -2,7 +2,7 @@
 
 This module contains the SideFrame class, which is responsible for setting up
 the side frame in the main application window. The side frame contains buttons
-that can copy text to the clipboard.
+that can copy text to the clipboard, with its placeholders filled.
 
 Classes:
     SideFrame: Manages the side frame setup and flow.
@@ -14,13 +14,17 @@ Usage:
 
 import tkinter as tk
 from tkinter import ttk
-from pyperclip import copy
+from utils import metrics
+from utils.clipboard import Clipboard
+from utils.template import get_template
 
 class SideFrame:
     """Manages the side frame setup and flow."""
-    def __init__(self, root, data: list, position: tuple):
+    def __init__(self, root, data: list, position: tuple, clipboard=None, variables=None):
         self.root = root
         self.data = data["buttons"]
+        self.clipboard = clipboard or Clipboard(self.root)
+        self.variables = {} if variables is None else variables
 
         # Create a Label with background color (For Debug purposes).
         self.label = tk.Frame(self.root, background='yellow')
@@ -30,21 +34,38 @@ class SideFrame:
                         sticky="wns")
 
         # Create buttons.
-        self.quick_copy_buttons = [self.create_button(text[0], text[1])
-                                   for text in self.data]
+        with metrics.span("SideFrame.create_buttons", buttons=len(self.data)):
+            self.quick_copy_buttons = [self.create_button(self.data[i][0],
+                                                          get_template(self.data, i))
+                                       for i in range(len(self.data))]
 
 
-    def create_button(self, button_label, text_to_copy):
-        """Create a button which copies its text to clipboard"""
+    def load_frame(self, data):
+        """Recreate the buttons if the given data differs from the current."""
+        buttons = data.get("buttons", [])
+        if list(buttons) == list(self.data):
+            return
+
+        for button in self.quick_copy_buttons:
+            button.destroy()
+        self.data = buttons
+        with metrics.span("SideFrame.create_buttons", buttons=len(self.data)):
+            self.quick_copy_buttons = [self.create_button(self.data[i][0],
+                                                          get_template(self.data, i))
+                                       for i in range(len(self.data))]
+
+
+    def create_button(self, button_label, template):
+        """Create a button which copies its filled template to clipboard"""
         button = ttk.Button(self.label,
                             text=button_label,
                             width=3,
                             style="side_frame.TButton",
-                            command=lambda: self.copy_to_clipboard(text_to_copy))
+                            command=lambda: self.copy_to_clipboard(template))
         button.pack(side="top", anchor="e")
         return button
 
 
-    def copy_to_clipboard(self, text, event=None):
-        """Copy text of button to clipboard"""
-        copy(text)
+    def copy_to_clipboard(self, template, event=None):
+        """Copy text of button to clipboard, filled with the variables"""
+        self.clipboard.copy(template.fill(self.variables))
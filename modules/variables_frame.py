@@ -0,0 +1,78 @@
+"""Manages the variables popup setup and flow.
+
+This module contains the VariablesFrame class, which is responsible for
+setting up a popup in which the reviewer enters the values of placeholders,
+one "NAME = value" per line. The values last for the session and are used to
+fill the placeholders of every text that is copied, see utils.template.
+
+Classes:
+    VariablesFrame: Manages the variables popup setup and flow.
+
+Usage:
+    Create an instance of the VariablesFrame class with the Tk root and the
+    dictionary of variables shared with the frames that copy text, then call
+    toggle to open or close it.
+"""
+
+# pylint: disable=unused-argument
+
+import tkinter as tk
+from tkinter import ttk
+from utils.template import parse_variables
+
+DEFAULT_VARIABLES = "NAME = "
+"""The text shown in the popup before any variable is set."""
+
+
+class VariablesFrame:
+    """Manages the variables popup setup and flow."""
+    def __init__(self, root, variables:dict):
+        self.root = root
+        self.variables = variables  # Shared, updated in place.
+        self.window = None
+        self.text = None
+
+
+    def toggle(self, event=None):
+        """Open the popup, or close it if it is already open."""
+        if self.window is None:
+            self.show()
+        else:
+            self.hide()
+
+
+    def show(self):
+        """Open the popup with the current variables."""
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Variables")
+        self.window.attributes("-topmost", True)
+        self.window.geometry(f"300x160+{max(self.root.winfo_x() - 310, 0)}+"
+                             f"{self.root.winfo_y()}")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        ttk.Label(self.window, text="One NAME = value per line").pack(side="top", anchor="w")
+        self.text = tk.Text(self.window, height=6, undo=True)
+        self.text.pack(side="top", fill=tk.BOTH, expand=True)
+        self.text.insert("1.0", "\n".join(f"{name} = {value}"
+                                          for name, value in self.variables.items())
+                         or DEFAULT_VARIABLES)
+        self.text.bind("<KeyRelease>", self.apply)
+        self.text.bind("<Escape>", self.hide)
+        self.text.focus_set()
+
+
+    def apply(self, event=None):
+        """Replace the variables with the ones in the popup."""
+        variables = parse_variables(self.text.get("1.0", tk.END))
+        self.variables.clear()
+        self.variables.update(variables)
+
+
+    def hide(self, event=None):
+        """Apply the variables and close the popup."""
+        if self.window is None:
+            return
+        self.apply()
+        self.window.destroy()
+        self.window = None
+        self.text = None
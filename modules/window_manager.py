@@ -2,6 +2,9 @@
 
 This module contains the WindowManager class, which is responsible for
 setting up the main Tkinter application window and managing its frames.
+The window and its header are drawn first, the side and body frames are
+built afterwards from idle callbacks and the time each stage took is kept
+in a StartupProfile, shown in the debug overlay.
 
 Classes:
     WindowManager: Manages the main application setup and flow.
@@ -10,21 +13,47 @@ Usage:
     Run this module to start the application.
 """
 
+import os
+import sys
 import tkinter as tk
 from modules.side_frame import SideFrame
 from modules.header_frame import HeaderFrame
 from modules.footer_frame import FooterFrame
 from modules.body_frame import BodyFrame
-from utils.load_data import load_task_data
+from modules.search_frame import SearchFrame
+from modules.debug_overlay import DebugOverlay
+from modules.variables_frame import VariablesFrame
+from utils import metrics
+from utils.background import BackgroundLoader
+from utils.cache import load_cached_task_data
+from utils.clipboard import Clipboard
+from utils.constants import METRICS_ENVIRONMENT_VARIABLE, METRICS_FILE
+from utils.file_watcher import FileWatcher, normalize_path
+from utils.journal import SessionJournal
+from utils.lazy_load import index_task_data
+from utils.load_data import set_default_parser
+from utils.prefetch import FileCache, Prefetcher
+from utils.search_index import SearchIndex, scan_changes, write_index
+from utils.startup import FIRST_PAINT, INTERACTIVE, StartupProfile
+
+SEARCH_UPDATE_INTERVAL = 30000
+"""The time in milliseconds between two scans for changed review files."""
+
 
 class WindowManager:
     """Manages the main application setup and flow."""
-    def __init__(self, config_data):
+    def __init__(self, config_data, started=None):
+        # Record timing spans before anything is loaded.
+        if (config_data.get("metrics_enabled", False)
+                or os.environ.get(METRICS_ENVIRONMENT_VARIABLE) == "1"):
+            metrics.enable()
+        self.startup = StartupProfile(started)
+        set_default_parser(config_data.get("parser", "buffer"))
+
         self.root = tk.Tk()
         self.root.attributes("-topmost", True)
         self.root.minsize(100, 100)
         self.root.overrideredirect(True)
-        self.root.bind("<Return>", self.get_body_data)
 
         self.config_data = config_data
 
@@ -32,34 +61,268 @@ class WindowManager:
         self.root.geometry(f"300x500+{self.screen_width - 300}+100")
 
         self.frames = []
+        self.clipboard = Clipboard(self.root, self.config_data.get("clipboard_backend", "tk"))
+        self.variables = {}     # Placeholder values of this session.
+        self.journal = SessionJournal(self.root)    # Checked boxes and selected tabs.
+        self.variables_frame = VariablesFrame(self.root, self.variables)
+        self.loader = BackgroundLoader(self.root)
+        self.reload_loaders = {}    # {(frame, path): BackgroundLoader}
+        self.file_watcher = FileWatcher(self.root, self.reload_file)
+
+        # Parsed files kept in memory, and the files likely to be opened next.
+        self.file_cache = FileCache()
+        self.prefetcher = Prefetcher(self.root, self.file_cache, self.load_body_data)
+
+        self.debug_overlay = DebugOverlay(self.root, {"file cache": self.file_cache.stats,
+                                                      "startup": self.startup.stats})
+        self.root.bind("<F12>", self.debug_overlay.toggle)
         self.default_active_directory = self.config_data["default_active_directory"]
 
+        # Search index of every review file in the active directory, loaded
+        # once the frames are built.
+        self.search_index = None
+        self.search_loader = BackgroundLoader(self.root, max_workers=1)
+        self.search_frame = None
+
+        self.startup.mark("window")
         self.create_frames()
 
     def create_frames(self):
-        """Creates the application frames."""
-        default_side_data = load_task_data(self.config_data["default_side_data"])
-        default_body_data = load_task_data(self.config_data["default_body_data"])
-        
-        # Create frames.
-        self.frames.append(HeaderFrame(self.root, (0, 0)))
-        self.frames.append(SideFrame(self.root, default_side_data, (1, 0)))
-        self.frames.append(BodyFrame(self.root, [default_body_data, default_body_data], [self.config_data["default_body_data"], self.config_data["default_body_data"]], (1,1)))
-        self.frames.append(FooterFrame(self.root, [], (1, 0)))
-
-        self.active_directory = self.frames[0].directory_field.get()
+        """
+        Creates the application frames in stages.
+        The header and footer are built at once so the window is drawn
+        early, the side and body frames follow from idle callbacks.
+        """
+        with metrics.span("startup.header"):
+            self.frames.append(HeaderFrame(self.root, (0, 0), self.show_search, self.default_active_directory))
+            self.frames.append(None)    # SideFrame, see create_side_frame.
+            self.frames.append(None)    # BodyFrame, see create_body_frame.
+            self.frames.append(FooterFrame(self.root, [], (1, 0), self.variables_frame.toggle))
 
         # Ensure that frames take up the entire area of the window.
         self.root.grid_rowconfigure(1, weight=1)
         self.root.grid_columnconfigure(1, weight=1)
         self.root.grid_columnconfigure(2, weight=1)
         self.root.grid_columnconfigure(3, weight=1)
+        self.run_after_paint(self.create_side_frame)
 
         self.root.mainloop()
+        self.journal.close()
+        self.file_watcher.stop()
+        self.loader.shutdown()
+        self.search_loader.shutdown()
+        self.prefetcher.shutdown()
+        for reload_loader in self.reload_loaders.values():
+            reload_loader.shutdown()
+        if metrics.is_enabled():
+            os.makedirs(os.path.dirname(METRICS_FILE), exist_ok=True)
+            metrics.export_jsonl(METRICS_FILE)
+
+    def run_after_paint(self, function, *args):
+        """
+        Runs function once Tk has handled the pending redraws.
+        Widgets are drawn by idle callbacks, a timer queued from an idle
+        callback only runs after them.
+        """
+        self.root.after_idle(self.root.after, 0, function, *args)
+
+    def create_side_frame(self):
+        """Builds the side frame, then loads the body data in the background."""
+        self.startup.mark(FIRST_PAINT)
+        with metrics.span("startup.side_frame"):
+            default_side_data = load_cached_task_data(self.config_data["default_side_data"])
+            self.frames[1] = SideFrame(self.root, default_side_data, (1, 0), self.clipboard, self.variables)
+        self.startup.mark("side frame")
+
+        directory = self.config_data["default_body_data"]
+        self.loader.submit(
+            self.file_cache.load,
+            directory,
+            self.load_body_data,
+            callback=lambda data: self.run_after_paint(self.create_body_frame, data),
+            error_callback=lambda error: self.run_after_paint(
+                self.create_body_frame,
+                {"ERROR": [(f"Could not load '{directory}'", str(error))]}
+                ))
+
+    def create_body_frame(self, default_body_data):
+        """Builds the body frame with the data of the default body file."""
+        self.startup.mark("body data")
+        directory = self.config_data["default_body_data"]
+        with metrics.span("startup.body_frame"):
+            self.journal.load()
+            self.frames[2] = BodyFrame(self.root, [default_body_data, default_body_data], [directory, directory], (1,1), self.clipboard, self.variables, self.journal)
+        self.startup.mark("body frame")
+        self.run_after_paint(self.finish_startup)
+
+    def finish_startup(self):
+        """Starts the background work and binds the shortcuts."""
+        with metrics.span("startup.search_index"):
+            self.search_index = SearchIndex.load(self.default_active_directory)
+            self.search_frame = SearchFrame(self.root,
+                                            self.search_index.search,
+                                            self.show_search_hit)
+
+        self.active_directory = self.frames[0].directory_field.get()
+        self.watch_files()
+        self.update_search_index()
+        self.prefetcher.prefetch(self.config_data["default_body_data"])
+
+        self.root.bind("<Return>", self.get_body_data)
+        self.root.bind("<Control-f>", self.show_search)
+        self.startup.mark(INTERACTIVE)
 
     def get_body_data(self, event):
         """Gets data for the body frame."""
-        self.active_directory = self.frames[0].directory_field.get()
-        self.frames[2].data[0] = load_task_data(self.active_directory)
-        self.frames[2].directory[0] = self.active_directory
+        self.open_body_file(self.frames[0].directory_field.get())
+
+    def open_body_file(self, directory, on_loaded=None):
+        """
+        Loads a file into the top body frame in the background.
+        The current data stays usable until the new data is loaded, files
+        found in the file cache are shown at once.
+        """
+        self.active_directory = directory
+        data = self.file_cache.get(directory)
+        if data is not None:
+            self.loader.cancel()    # Drop a slower load that is still running.
+            self.show_body_data(directory, data, on_loaded)
+            return
+
+        self.frames[0].set_loading(True)
+        self.loader.submit(
+            self.file_cache.load,
+            directory,
+            self.load_body_data,
+            self.frames[2].data[0],
+            callback=lambda data: self.show_body_data(directory, data, on_loaded),
+            error_callback=lambda error: self.show_body_data(
+                directory,
+                {"ERROR": [(f"Could not load '{directory}'", str(error))]}
+                ))
+
+    def show_body_data(self, directory, data, on_loaded=None):
+        """Shows data loaded by open_body_file in the body frame."""
+        self.frames[0].set_loading(False)
+        self.frames[2].data[0] = data
+        self.frames[2].directory[0] = directory
         self.frames[2].load_frame()
+        self.watch_files()
+        self.prefetcher.prefetch(directory)
+        if on_loaded is not None:
+            on_loaded()
+
+    def show_search(self, event=None):
+        """Opens the search popup."""
+        if self.search_frame is not None:
+            self.search_frame.show()
+
+    def show_search_hit(self, path, tab_label, checkbox_index, label):
+        """Opens the file of a search hit and jumps to its checkbox."""
+        self.frames[0].directory_field.delete(0, tk.END)
+        self.frames[0].directory_field.insert(0, path)
+        self.open_body_file(
+            path,
+            lambda: self.frames[2].show_checkbox(0, tab_label, checkbox_index)
+            )
+
+    def update_search_index(self):
+        """
+        Updates the search index with the files that changed, then
+        schedules the next update.
+        """
+        if not self.search_loader.busy:
+            self.search_loader.submit(
+                scan_changes,
+                self.default_active_directory,
+                self.search_index.identities(),
+                callback=self.apply_search_changes,
+                # Files that fail are skipped by scan_changes, anything
+                # else is tried again at the next update.
+                error_callback=lambda error: None
+                )
+        self.root.after(SEARCH_UPDATE_INTERVAL, self.update_search_index)
+
+    def apply_search_changes(self, changes):
+        """
+        Applies changes found by scan_changes to the search index, then
+        stores a copy of it in the search worker, which keeps the next scan
+        waiting until it is written.
+        """
+        if changes:
+            self.search_index.apply(changes)
+            self.search_loader.submit(
+                write_index,
+                self.search_index.directory,
+                dict(self.search_index.documents),
+                callback=lambda result: None,
+                error_callback=lambda error: None
+                )
+
+    def watch_files(self):
+        """Watches the side frame file and the files of the body frame."""
+        self.file_watcher.set_files(
+            [self.config_data["default_side_data"], *self.frames[2].directory]
+            )
+
+    def reload_file(self, path):
+        """
+        Reloads a watched file that changed on disk.
+        Only the tabs that changed are updated, see BodyFrame.load_frame.
+        """
+        side_directory = self.config_data["default_side_data"]
+        if normalize_path(side_directory) == path:
+            # The side frame has no place for errors, it keeps its buttons.
+            self.get_reload_loader("side", path).submit(
+                load_cached_task_data,
+                side_directory,
+                callback=self.frames[1].load_frame,
+                error_callback=lambda error: print(
+                    f"Could not load '{side_directory}': {error}", file=sys.stderr
+                    ))
+
+        body_frame = self.frames[2]
+        panes = [i for i, directory in enumerate(body_frame.directory)
+                 if normalize_path(directory) == path]
+        if not panes:
+            return
+
+        directory = body_frame.directory[panes[0]]
+        self.get_reload_loader("body", path).submit(
+            self.file_cache.load,
+            directory,
+            self.load_body_data,
+            body_frame.data[panes[0]],
+            callback=lambda data: self.show_reloaded_data(directory, data),
+            error_callback=lambda error: self.show_reloaded_data(
+                directory,
+                {"ERROR": [(f"Could not load '{directory}'", str(error))]}
+                ))
+
+    def get_reload_loader(self, frame, path):
+        """
+        Returns the loader that reloads path for frame.
+        Each frame and file has its own loader, so that changes to different
+        files do not cancel each other.
+        """
+        if (frame, path) not in self.reload_loaders:
+            self.reload_loaders[(frame, path)] = BackgroundLoader(self.root, max_workers=1)
+        return self.reload_loaders[(frame, path)]
+
+    def show_reloaded_data(self, directory, data):
+        """Shows reloaded data in every pane that still shows directory."""
+        body_frame = self.frames[2]
+        for i, pane_directory in enumerate(body_frame.directory):
+            if pane_directory == directory:
+                body_frame.data[i] = data
+        body_frame.load_frame()
+
+    def load_body_data(self, directory, previous=None):
+        """
+        Loads the data of a body frame file, indexing it lazily if
+        "lazy_loading" is enabled in the config. Unchanged tabs of previous
+        are reused instead of being parsed again.
+        """
+        if self.config_data.get("lazy_loading", False):
+            return index_task_data(directory, previous)
+        return load_cached_task_data(directory, previous=previous)
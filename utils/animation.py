@@ -0,0 +1,121 @@
+"""Module for animating values with the Tk event loop.
+
+This module contains the Animation class, which moves a value from a start
+to an end over a fixed duration. Frames are scheduled with root.after, so the
+event loop is never blocked, and the value of every frame is computed from
+the elapsed time, so an animation takes the same time on every machine no
+matter how many frames are dropped.
+
+Classes:
+    Animation: Animates a value over a fixed duration.
+
+Functions:
+    linear: Linear easing.
+    ease_in_out_cubic: Cubic easing, slow at both ends.
+    ease_out_cubic: Cubic easing, slow at the end.
+
+Usage:
+    Create an instance of the Animation class with the Tk root and a function
+    to apply each value, then call start with the start and end values.
+    Calling start again while running continues from the current value.
+"""
+
+import time
+
+
+def linear(progress:float) -> float:
+    """Linear easing."""
+    return progress
+
+
+def ease_in_out_cubic(progress:float) -> float:
+    """Cubic easing, slow at both ends."""
+    if progress < 0.5:
+        return 4 * progress ** 3
+    return 1 - (-2 * progress + 2) ** 3 / 2
+
+
+def ease_out_cubic(progress:float) -> float:
+    """Cubic easing, slow at the end."""
+    return 1 - (1 - progress) ** 3
+
+
+class Animation:
+    """Animates a value over a fixed duration."""
+    FRAME_INTERVAL = 1 / 60
+    """The time in seconds between two frames."""
+
+    def __init__(self, root, apply, duration:float=0.2,
+                 easing=ease_in_out_cubic, on_finish=None):
+        self.root = root
+        self.apply = apply          # Called with the value of every frame.
+        self.duration = duration    # Time in seconds of a full animation.
+        self.easing = easing
+        self.on_finish = on_finish
+        self.start_value = 0
+        self.end_value = 0
+        self.value = 0
+        self.start_time = 0.0
+        self.run_time = 0.0
+        self.next_frame = 0.0
+        self.after_id = None
+
+
+    @property
+    def running(self) -> bool:
+        """True if the animation has not reached its end value yet."""
+        return self.after_id is not None
+
+
+    def start(self, start_value, end_value, fraction:float=1.0):
+        """
+        Animate from start_value to end_value.
+
+        Args:
+        - start_value: The value of the first frame.
+        - end_value: The value of the last frame.
+        - fraction (float): The part of a full animation this one covers,
+          used to shorten animations that were interrupted partway.
+        """
+        self.stop()
+        self.start_value = start_value
+        self.end_value = end_value
+        self.value = start_value
+        self.start_time = time.perf_counter()
+        self.run_time = self.duration * min(max(fraction, 0.0), 1.0)
+        self.next_frame = self.start_time
+        self.step()
+
+
+    def step(self):
+        """Apply the value of the current frame and schedule the next one."""
+        now = time.perf_counter()
+        progress = 1.0
+        if self.run_time > 0:
+            progress = min((now - self.start_time) / self.run_time, 1.0)
+
+        self.value = self.start_value + (
+            (self.end_value - self.start_value) * self.easing(progress)
+            )
+        self.apply(round(self.value))
+
+        if progress >= 1.0:
+            self.after_id = None
+            if self.on_finish is not None:
+                self.on_finish()
+            return
+
+        # Keep to the frame budget, skipping frames that are already late.
+        self.next_frame += self.FRAME_INTERVAL
+        now = time.perf_counter()
+        if self.next_frame < now:
+            self.next_frame = now
+        delay = max(int((self.next_frame - now) * 1000), 1)
+        self.after_id = self.root.after(delay, self.step)
+
+
+    def stop(self):
+        """Stop the animation at its current value."""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
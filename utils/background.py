@@ -0,0 +1,96 @@
+"""Module for running slow work off the Tk thread.
+
+This module contains the BackgroundLoader class, which runs functions in a
+small pool of worker threads and hands their results back to the Tk event
+loop by polling with root.after. Starting a new job supersedes the previous
+one, whose result is discarded if it is still running.
+
+Classes:
+    BackgroundLoader: Runs functions in worker threads for the Tk loop.
+
+Usage:
+    Create an instance of the BackgroundLoader class with the Tk root and
+    call submit with the function to run and a callback for its result.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundLoader:
+    """Runs functions in worker threads for the Tk loop."""
+    POLL_INTERVAL = 30
+    """The time in milliseconds between checks for a finished job."""
+
+    def __init__(self, root, max_workers:int=2):
+        self.root = root
+        # More than one worker so that a superseded job which is still
+        # blocked on a slow read does not delay the job replacing it.
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="loader")
+        self.generation = 0
+        self.future = None
+
+
+    @property
+    def busy(self) -> bool:
+        """True if the latest job has not finished yet."""
+        return self.future is not None
+
+
+    def submit(self, function, *args, callback, error_callback=None):
+        """
+        Run function(*args) in a worker, cancelling the previous job.
+
+        Args:
+        - function (callable): The function to run in the worker.
+        - args: The arguments to pass to function.
+        - callback (callable): Called on the Tk thread with the result.
+        - error_callback (callable): Called on the Tk thread with the
+          exception raised by function. Exceptions are re-raised if None.
+        """
+        self.cancel()
+        self.future = self.executor.submit(function, *args)
+        self.root.after(self.POLL_INTERVAL,
+                        self.poll,
+                        self.future,
+                        self.generation,
+                        callback,
+                        error_callback)
+
+
+    def cancel(self):
+        """Cancel the latest job, discarding its result if it is running."""
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        self.generation += 1
+
+
+    def poll(self, future, generation, callback, error_callback):
+        """Hand the result of a finished job to its callback."""
+        if generation != self.generation:
+            return  # Superseded by a newer job.
+
+        if not future.done():
+            self.root.after(self.POLL_INTERVAL,
+                            self.poll,
+                            future,
+                            generation,
+                            callback,
+                            error_callback)
+            return
+
+        self.future = None
+        error = future.exception()
+        if error is None:
+            callback(future.result())
+        elif error_callback is not None:
+            error_callback(error)
+        else:
+            raise error
+
+
+    def shutdown(self):
+        """Stop accepting jobs and drop the jobs that have not started."""
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
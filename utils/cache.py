@@ -0,0 +1,184 @@
+"""Module for caching parsed task files on disk.
+
+This module keeps a snapshot of every parsed task file in a cache directory so
+that loading the same file again skips parsing and validation entirely. Each
+snapshot is keyed on the absolute path of the file and stores the file's
+modification time, size and content hash, and the parser that produced it.
+Snapshots that no longer match the file on disk, or that were produced by
+another parser than the default one, are detected and rebuilt automatically.
+
+Functions:
+    load_cached_task_data: Load task data, using the cache when possible.
+    clear_cache: Remove every snapshot from the cache directory.
+
+Usage:
+    Use load_cached_task_data in place of load_task_data when the same file
+    is likely to be loaded more than once.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+from utils import load_data, metrics
+from utils.constants import CACHE_DIRECTORY, CACHE_SIZE_LIMIT
+from utils.load_data import load_task_data
+
+CACHE_FILE_EXTENSION = ".pickle"
+CACHE_FORMAT = 5
+"""Bumped when the type of the cached data or the data a file parses to
+changes, older snapshots are ignored."""
+
+
+def load_cached_task_data(directory:str,
+                          cache_directory:str=CACHE_DIRECTORY,
+                          size_limit:int=CACHE_SIZE_LIMIT,
+                          previous=None) -> dict:
+    """
+    Load data from a file, reusing the cached snapshot if it is still valid.
+
+    Args:
+    - directory (str): The directory path of the file.
+    - cache_directory (str): The directory in which snapshots are stored.
+    - size_limit (int): The maximum total size in bytes of the cache.
+    - previous (TaskData): An earlier load of the file, whose unchanged tabs
+      are reused if the file has to be parsed, see load_task_data.
+
+    Returns:
+    - dict: A nested dictionary containing the loaded data.
+    """
+
+    # Invalid paths are not cached, let the loader report the error.
+    if not os.path.isfile(directory):
+        return load_task_data(directory)
+
+    stat = os.stat(directory)
+    # Parsers differ on malformed files, a snapshot is only valid for its own.
+    parser = load_data.default_parser
+    cache_path = get_cache_path(directory, cache_directory)
+    with metrics.span("read_cache_entry", path=directory) as timing:
+        entry = read_entry(cache_path)
+        if timing:
+            timing.set(hit=entry is not None)
+
+    if entry is not None and entry.get("parser") == parser:
+        # The file has not been touched since the snapshot was taken.
+        if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            touch_entry(cache_path)
+            return entry["data"]
+
+        # The file was touched, but its content may still be the same.
+        if entry["size"] == stat.st_size and entry["hash"] == hash_file(directory):
+            entry["mtime"] = stat.st_mtime_ns
+            write_entry(cache_path, entry)
+            return entry["data"]
+
+    # Cache miss or stale snapshot, parse the file and store the result.
+    content_hash = hash_file(directory)
+    data = load_task_data(directory, previous=previous)
+    write_entry(cache_path, {
+        "path": os.path.abspath(directory),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": content_hash,
+        "parser": parser,
+        "format": CACHE_FORMAT,
+        "data": data
+        })
+    evict_entries(cache_directory, size_limit)
+    return data
+
+
+def get_cache_path(directory:str, cache_directory:str) -> str:
+    """Return the path of the snapshot belonging to the file at directory."""
+    key = hashlib.sha1(
+        os.path.normcase(os.path.abspath(directory)).encode("utf-8")
+        ).hexdigest()
+    return os.path.join(cache_directory, key + CACHE_FILE_EXTENSION)
+
+
+def hash_file(directory:str) -> str:
+    """Return the hexadecimal SHA-1 digest of the content of a file."""
+    digest = hashlib.sha1()
+    with open(directory, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_entry(cache_path:str):
+    """Return the snapshot stored at cache_path, or None if unusable."""
+    try:
+        with open(cache_path, "rb") as file:
+            entry = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+            ImportError, IndexError, TypeError, ValueError):
+        return None
+
+    if not isinstance(entry, dict) or entry.keys() < {"mtime", "size", "hash", "data"}:
+        return None
+    if entry.get("format") != CACHE_FORMAT:
+        return None
+    return entry
+
+
+def write_entry(cache_path:str, entry:dict):
+    """Atomically write a snapshot to cache_path."""
+    temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, "wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # A cache that cannot be written should never break loading.
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def touch_entry(cache_path:str):
+    """Mark a snapshot as recently used."""
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+
+def evict_entries(cache_directory:str, size_limit:int):
+    """Remove the least recently used snapshots until under size_limit."""
+    entries = []
+    total_size = 0
+    try:
+        with os.scandir(cache_directory) as scan:
+            for item in scan:
+                if item.is_file() and item.name.endswith(CACHE_FILE_EXTENSION):
+                    stat = item.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+                    total_size += stat.st_size
+    except OSError:
+        return
+
+    entries.sort()
+    for _, size, path in entries:
+        if total_size <= size_limit:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+        except OSError:
+            pass
+
+
+def clear_cache(cache_directory:str=CACHE_DIRECTORY):
+    """Remove every snapshot from the cache directory."""
+    evict_entries(cache_directory, 0)
+
+
+if __name__ == "__main__":
+    # Load the same file twice, the second load should come from the cache.
+    import time
+    for attempt in range(2):
+        start = time.perf_counter()
+        test_data = load_cached_task_data("data/general.txt")
+        print(f"Load {attempt + 1}: {time.perf_counter() - start:.6f}s,",
+              f"{len(test_data)} tabs")
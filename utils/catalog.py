@@ -0,0 +1,176 @@
+"""Module for building a catalog of every review file in a directory tree.
+
+This module contains the Catalog class, one merged view of the files, tabs
+and checkboxes of every review file under a directory, and build_catalog,
+which parses the files in parallel with a process pool. A file that cannot
+be loaded is recorded with its error instead of stopping the build, a file
+loaded with problems is recorded with its valid tabs and its first problem.
+
+Classes:
+    Catalog: Merged, queryable view of the review files in a tree.
+
+Functions:
+    build_catalog: Parse every review file under a directory in parallel.
+    parse_file: Load one file, run in the worker processes.
+
+Usage:
+    Build a catalog with build_catalog(directory), then use its tabs,
+    checkboxes and find methods. Run this module to print a summary and the
+    throughput of a build:
+        python -m utils.catalog data --workers 4
+"""
+
+import argparse
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from utils.constants import REVIEW_SOURCE_DIRECTORY
+from utils.load_data import ERROR_TAB, load_task_data
+from utils.task_model import TaskData
+from utils.search_index import list_review_files
+
+SERIAL_FILE_LIMIT = 16
+"""Trees with fewer files are parsed in this process, a pool costs more."""
+
+
+def parse_file(path:str, parser:str=None) -> tuple:
+    """
+    Load one file, run in the worker processes.
+
+    Returns:
+    - tuple: (path, data, None) if the file loaded, (path, data, (message,
+      detail)) if it loaded with problems, where data holds the valid tabs
+      only, else (path, None, (message, detail)).
+    """
+    try:
+        data = load_task_data(path, parser)
+    except (OSError, UnicodeDecodeError) as error:
+        return (path, None, (f"Could not load '{path}'", str(error)))
+    if ERROR_TAB in data:
+        # The problems are reported as the error, not as a tab of the file.
+        error = tuple(data[ERROR_TAB][0])
+        tabs = tuple(tab for tab in data.tabs if tab.label != ERROR_TAB)
+        return (path, TaskData(tabs, data.buffer) if tabs else None, error)
+    if "ERROR" in data:
+        return (path, None, tuple(data["ERROR"][0]))
+    return (path, data, None)
+
+
+class Catalog:
+    """Merged, queryable view of the review files in a tree."""
+    def __init__(self, directory:str):
+        self.directory = directory
+        self.files = {}     # {path: TaskData}
+        self.errors = {}    # {path: (message, detail)}
+        self.stats = {}
+
+
+    def add(self, path:str, data, error):
+        """Add the result of parse_file."""
+        if data is not None:
+            self.files[path] = data
+        if error is not None:
+            self.errors[path] = error
+
+
+    def tabs(self, path:str=None):
+        """Yield (path, tab label) of every tab, or of the tabs of path."""
+        for file_path in (self.files if path is None else [path]):
+            for tab_label in self.files.get(file_path, {}):
+                yield (file_path, tab_label)
+
+
+    def checkboxes(self, path:str=None, tab_label:str=None):
+        """
+        Yield (path, tab label, index, label) of every checkbox, optionally
+        only those of one file and one tab.
+        """
+        for file_path, file_tab in self.tabs(path):
+            if tab_label is None or file_tab == tab_label:
+                tab = self.files[file_path][file_tab]
+                for index, label in enumerate(tab.labels):
+                    yield (file_path, file_tab, index, label)
+
+
+    def text(self, path:str, tab_label:str, index:int) -> str:
+        """Return the text of a checkbox."""
+        return self.files[path][tab_label].text(index)
+
+
+    def find(self, text:str):
+        """Yield the checkboxes whose label contains text, ignoring case."""
+        text = text.lower()
+        for hit in self.checkboxes():
+            if text in hit[3].lower():
+                yield hit
+
+
+    def summary(self) -> dict:
+        """Return the number of files, errors, tabs and checkboxes."""
+        return {
+            "files": len(self.files),
+            "errors": len(self.errors),
+            "tabs": sum(len(data) for data in self.files.values()),
+            "checkboxes": sum(len(tab) for data in self.files.values()
+                              for tab in data.values())
+            }
+
+
+def build_catalog(directory:str=REVIEW_SOURCE_DIRECTORY, workers:int=None,
+                  parser:str=None, paths:list=None) -> Catalog:
+    """
+    Parse every review file under directory in parallel.
+
+    Args:
+    - directory (str): The root of the tree.
+    - workers (int): The number of processes, os.cpu_count() if None. Use 1
+      to parse in this process.
+    - parser (str): The parser of load_task_data to use in every worker.
+    - paths (list): The files to parse, every review file under directory
+      if None.
+
+    Returns:
+    - Catalog: The merged catalog, its stats holding the time taken and the
+      throughput in files per second.
+    """
+    start = time.perf_counter()
+    if paths is None:
+        paths = list_review_files(directory)
+    workers = workers or os.cpu_count() or 1
+    catalog = Catalog(directory)
+    parse = functools.partial(parse_file, parser=parser)
+
+    if workers == 1 or len(paths) < SERIAL_FILE_LIMIT:
+        workers = 1
+        for result in map(parse, paths):
+            catalog.add(*result)
+    else:
+        # Large chunks keep the cost of sending work to the processes low.
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(parse, paths, chunksize=chunksize):
+                catalog.add(*result)
+
+    seconds = time.perf_counter() - start
+    catalog.stats = {
+        "workers": workers,
+        "seconds": seconds,
+        "files_per_second": len(paths) / seconds if seconds else 0.0
+        }
+    return catalog
+
+
+if __name__ == "__main__":
+    arguments_parser = argparse.ArgumentParser(description="Catalog every review file.")
+    arguments_parser.add_argument("directory", nargs="?", default=REVIEW_SOURCE_DIRECTORY)
+    arguments_parser.add_argument("--workers", type=int, default=None)
+    arguments = arguments_parser.parse_args()
+
+    test_catalog = build_catalog(arguments.directory, arguments.workers)
+    print(test_catalog.summary())
+    for error_path, (error_message, error_detail) in test_catalog.errors.items():
+        print(f"{error_path}: {error_message} {error_detail}".rstrip())
+    print(f"{test_catalog.stats['files_per_second']:.1f} files/s with "
+          f"{test_catalog.stats['workers']} worker(s) in "
+          f"{test_catalog.stats['seconds'] * 1000:.1f} ms")
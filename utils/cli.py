@@ -0,0 +1,167 @@
+"""Module for reading review files from the command line, without the GUI.
+
+This module lists the files, tabs and checkboxes of review files and prints
+the texts of chosen checkboxes, as plain text or as JSON. It only imports the
+loading modules, tkinter and pyperclip are never loaded, so it starts quickly
+enough to be called inside shell loops. main.py runs it when it is given
+arguments.
+
+Functions:
+    main: Run the command line interface.
+    expand_paths: Replace folders by the review files they contain.
+    select_checkboxes: Yield the checkboxes of a catalog matching filters.
+
+Usage:
+    List the checkboxes of every file in a folder:
+        python main.py list data --checkboxes
+    Print the texts of two checkboxes of a file:
+        python main.py show data/general.txt -c 1A -c 2C
+    Emit every checkbox of a tab of several files as JSON:
+        python main.py show data/general.txt data/test_file_1.txt -t 1 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+from utils.catalog import build_catalog
+from utils.constants import REVIEW_SOURCE_DIRECTORY
+from utils.load_data import PARSERS
+from utils.search_index import list_review_files
+
+
+def expand_paths(paths:list) -> list:
+    """Return paths with every folder replaced by the review files under it."""
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded.extend(list_review_files(path))
+        else:
+            expanded.append(path)
+    return list(dict.fromkeys(expanded))
+
+
+def select_checkboxes(catalog, tabs:list=None, labels:list=None):
+    """
+    Yield the checkboxes of a catalog in the given tabs and with the given
+    labels, every checkbox if both are empty.
+
+    Yields:
+    - tuple: (path, tab label, index, checkbox label)
+    """
+    for checkbox in catalog.checkboxes():
+        if (not tabs or checkbox[1] in tabs) and (not labels or checkbox[3] in labels):
+            yield checkbox
+
+
+def list_records(catalog, level:str) -> list:
+    """Return one record per file, tab or checkbox of a catalog."""
+    if level == "files":
+        return [{"path": path} for path in catalog.files]
+    if level == "tabs":
+        return [{"path": path, "tab": tab} for path, tab in catalog.tabs()]
+    return [{"path": path, "tab": tab, "checkbox": label}
+            for path, tab, _, label in catalog.checkboxes()]
+
+
+def show_records(catalog, tabs:list, labels:list) -> list:
+    """Return the record of every chosen checkbox, with its text."""
+    return [{"path": path, "tab": tab, "checkbox": label,
+             "text": catalog.text(path, tab, index)}
+            for path, tab, index, label in select_checkboxes(catalog, tabs, labels)]
+
+
+def print_records(records:list, as_json:bool, headers:bool=False):
+    """Print records as JSON, or as lines of tab separated fields."""
+    if as_json:
+        json.dump(records, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    for number, record in enumerate(records):
+        if "text" not in record:
+            print("\t".join(record.values()))
+            continue
+        # Texts span several lines, they are separated by a blank line.
+        if number:
+            print()
+        if headers:
+            print(f"==> {record['path']} | {record['tab']} | {record['checkbox']} <==")
+        print(record["text"])
+
+
+def create_parser(directory:str) -> argparse.ArgumentParser:
+    """Return the parser of the command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Read review files without starting the GUI."
+        )
+    parser.add_argument("--parser", choices=sorted(PARSERS), default=None,
+                        help="The parser used to load the files.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="The number of processes loading the files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_command = commands.add_parser("list", help="List files, tabs or checkboxes.")
+    list_command.add_argument("paths", nargs="*", default=[directory],
+                              help="Files and folders, the data folder by default.")
+    level = list_command.add_mutually_exclusive_group()
+    level.add_argument("--tabs", dest="level", action="store_const", const="tabs",
+                       help="List the tabs of every file.")
+    level.add_argument("--checkboxes", dest="level", action="store_const",
+                       const="checkboxes", help="List the checkboxes of every tab.")
+    list_command.add_argument("--json", action="store_true", help="Print JSON.")
+    list_command.set_defaults(level="files")
+
+    show_command = commands.add_parser("show", help="Print the texts of checkboxes.")
+    show_command.add_argument("paths", nargs="+", help="Files and folders.")
+    show_command.add_argument("-t", "--tab", dest="tabs", action="append", default=[],
+                              help="Only show checkboxes of this tab, can be repeated.")
+    show_command.add_argument("-c", "--checkbox", dest="labels", action="append",
+                              default=[], help="Only show this checkbox, can be repeated.")
+    show_command.add_argument("--headers", action="store_true",
+                              help="Print the file, tab and checkbox before every text.")
+    show_command.add_argument("--json", action="store_true", help="Print JSON.")
+    return parser
+
+
+def main(arguments:list=None, directory:str=REVIEW_SOURCE_DIRECTORY) -> int:
+    """
+    Run the command line interface.
+
+    Args:
+    - arguments (list): The command line arguments, sys.argv[1:] if None.
+    - directory (str): The folder listed when no path is given.
+
+    Returns:
+    - int: The exit status, 1 if a file could not be loaded or a chosen tab
+      or checkbox was not found, else 0.
+    """
+    arguments = create_parser(directory).parse_args(arguments)
+    if hasattr(sys.stdout, "reconfigure"):
+        # Texts may hold characters the console encoding cannot print.
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    catalog = build_catalog(workers=arguments.workers,
+                            parser=arguments.parser,
+                            paths=expand_paths(arguments.paths))
+    status = 0
+    for path, (message, detail) in catalog.errors.items():
+        print(f"{path}: {message} {detail}".rstrip(), file=sys.stderr)
+        status = 1
+
+    if arguments.command == "list":
+        print_records(list_records(catalog, arguments.level), arguments.json)
+        return status
+
+    records = show_records(catalog, arguments.tabs, arguments.labels)
+    for name, wanted, key in (("tab", arguments.tabs, "tab"),
+                              ("checkbox", arguments.labels, "checkbox")):
+        for missing in set(wanted) - {record[key] for record in records}:
+            print(f"No {name} '{missing}' found", file=sys.stderr)
+            status = 1
+    print_records(records, arguments.json, arguments.headers)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
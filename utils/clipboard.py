@@ -0,0 +1,98 @@
+"""Module for copying text to the clipboard.
+
+This module contains the Clipboard class, which copies text through a list of
+backends, falling back to the next one when a backend fails. The default
+backend uses the clipboard of the Tk root the application already runs, so
+copying needs no subprocess and the root keeps ownership of the content for
+as long as the application is open. pyperclip is kept as a fallback and is
+only imported when it is first needed.
+
+Every copy is recorded as a "clipboard.<backend>" span by utils.metrics, so
+the latency of each backend shows up in the debug overlay.
+
+Classes:
+    TkBackend: Copies text with the clipboard of a Tk root.
+    PyperclipBackend: Copies text with pyperclip.
+    Clipboard: Copies text through the first backend that works.
+
+Usage:
+    Create one Clipboard with the Tk root and share it between frames, then
+    call copy with the text to copy.
+"""
+
+import tkinter as tk
+from utils import metrics
+
+
+class TkBackend:
+    """Copies text with the clipboard of a Tk root."""
+    name = "tk"
+
+    def __init__(self, root):
+        self.root = root
+
+
+    def copy(self, text:str):
+        """Replace the content of the clipboard with text."""
+        # The text is handed to Tcl as is, no copy is made on this side.
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+
+
+class PyperclipBackend:
+    """Copies text with pyperclip."""
+    name = "pyperclip"
+
+    def __init__(self, root=None):
+        self.function = None
+
+
+    def copy(self, text:str):
+        """Replace the content of the clipboard with text."""
+        if self.function is None:
+            # pylint: disable=import-outside-toplevel
+            from pyperclip import copy
+            self.function = copy
+        self.function(text)
+
+
+BACKENDS = {backend.name: backend for backend in (TkBackend, PyperclipBackend)}
+"""The available backends by name, in the order they are tried."""
+
+
+class Clipboard:
+    """Copies text through the first backend that works."""
+    def __init__(self, root, preferred:str="tk"):
+        names = [preferred] + [name for name in BACKENDS if name != preferred]
+        self.backends = [BACKENDS[name](root) for name in names if name in BACKENDS]
+
+
+    @property
+    def backend(self) -> str:
+        """The name of the backend used for the next copy."""
+        return self.backends[0].name if self.backends else ""
+
+
+    def copy(self, text:str) -> str:
+        """
+        Copy text to the clipboard.
+        A backend that fails is skipped from then on and the next one is
+        tried, the last backend is always kept so later copies can retry it.
+
+        Args:
+        - text (str): The text to copy.
+
+        Returns:
+        - str: The name of the backend that copied the text.
+        """
+        while True:
+            backend = self.backends[0]
+            try:
+                with metrics.span(f"clipboard.{backend.name}", characters=len(text)):
+                    backend.copy(text)
+                return backend.name
+            except (tk.TclError, ImportError, RuntimeError, OSError) as error:
+                # pyperclip raises PyperclipException, a RuntimeError.
+                if len(self.backends) == 1:
+                    raise RuntimeError("No clipboard backend could copy the text") from error
+                self.backends.pop(0)
@@ -40,3 +40,36 @@ ENCODING = "utf-8"
 
 REVIEW_FILE_EXTENSION = "txt"
 """The file extension used for review files."""
+
+CACHE_DIRECTORY = ".cache"
+"""The directory used to store parsed review files between runs."""
+
+CACHE_SIZE_LIMIT = 64 * 1024 * 1024
+"""The maximum size in bytes of the parsed file cache."""
+
+FILE_CACHE_MEMORY_LIMIT = 32 * 1024 * 1024
+"""The maximum estimated size in bytes of the parsed files kept in memory."""
+
+PREFETCH_NEXT_FILES = 2
+"""The number of files following the active file in its folder to prefetch."""
+
+PREFETCH_RECENT_FILES = 5
+"""The number of recently opened files kept loaded for switching back."""
+
+METRICS_FILE = ".cache/metrics.jsonl"
+"""The file timing spans are appended to when the application closes."""
+
+METRICS_ENVIRONMENT_VARIABLE = "REVIEW_TOOLKIT_METRICS"
+"""Set to 1 to record timing spans without changing the config."""
+
+SESSION_JOURNAL_FILE = ".cache/session.jsonl"
+"""The journal the changes to the checked boxes and selected tabs are appended to."""
+
+SESSION_SNAPSHOT_FILE = ".cache/session.json"
+"""The snapshot of the session the journal is compacted into."""
+
+SESSION_FLUSH_INTERVAL = 1000
+"""The time in milliseconds changes to the session are held before writing."""
+
+SESSION_COMPACT_RECORDS = 1000
+"""The number of journal records after which the journal is compacted."""
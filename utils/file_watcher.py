@@ -0,0 +1,198 @@
+"""Module for watching files for changes.
+
+This module contains the FileWatcher class, which reports changes to a set of
+files to the Tk event loop. On Linux the directories containing the files are
+watched through inotify, so that a check only costs a single non-blocking
+read. Elsewhere, or if inotify is unavailable, the files are checked with
+os.stat on every poll.
+
+Classes:
+    FileWatcher: Reports changes to a set of files to the Tk loop.
+
+Usage:
+    Create an instance of the FileWatcher class with the Tk root and a
+    callback, then call set_files with the paths to watch. The callback is
+    called with the path of every file whose modification time or size
+    changed.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+# inotify flags, see inotify(7).
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+              | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def normalize_path(path:str) -> str:
+    """Return a path in the form used to identify watched files."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def get_identity(path:str):
+    """Return (mtime, size) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class Inotify:
+    """Minimal ctypes wrapper around the Linux inotify API."""
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}   # {watch descriptor: directory}
+
+
+    def add_watch(self, directory:str):
+        """Watch a directory, returning its watch descriptor."""
+        descriptor = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), WATCH_MASK
+            )
+        if descriptor < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch '{directory}'")
+        self.directories[descriptor] = directory
+        return descriptor
+
+
+    def remove_watch(self, descriptor:int):
+        """Stop watching the directory with the given watch descriptor."""
+        self.libc.inotify_rm_watch(self.fd, descriptor)
+        self.directories.pop(descriptor, None)
+
+
+    def read_paths(self) -> set:
+        """Return the paths of all files with pending events."""
+        paths = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return paths
+
+            offset = 0
+            while offset < len(buffer):
+                descriptor, _, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if descriptor in self.directories and name:
+                    paths.add(normalize_path(
+                        os.path.join(self.directories[descriptor], os.fsdecode(name))
+                        ))
+
+
+    def close(self):
+        """Release the inotify file descriptor."""
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Reports changes to a set of files to the Tk loop."""
+    POLL_INTERVAL = 1000
+    """The time in milliseconds between two stat checks of every file."""
+
+    EVENT_INTERVAL = 250
+    """The time in milliseconds between two reads of inotify events."""
+
+    def __init__(self, root, callback):
+        self.root = root
+        self.callback = callback
+        self.files = {}         # {path: (mtime, size)}
+        self.directories = {}   # {directory: watch descriptor}
+        self.after_id = None
+
+        self.inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError, TypeError):
+                self.inotify = None
+
+        self.schedule()
+
+
+    def set_files(self, paths):
+        """Watch exactly the given files."""
+        files = {}
+        for path in paths:
+            path = normalize_path(path)
+            files[path] = self.files[path] if path in self.files else get_identity(path)
+        self.files = files
+
+        if self.inotify is not None:
+            self.update_directories()
+
+
+    def update_directories(self):
+        """Watch the directories containing the watched files."""
+        directories = {os.path.dirname(path) for path in self.files}
+        for directory in set(self.directories) - directories:
+            self.inotify.remove_watch(self.directories.pop(directory))
+        for directory in directories - set(self.directories):
+            try:
+                self.directories[directory] = self.inotify.add_watch(directory)
+            except OSError:
+                # Fall back to stat polling for every file.
+                self.stop_inotify()
+                return
+
+
+    def stop_inotify(self):
+        """Stop using inotify and check the files with os.stat instead."""
+        if self.inotify is not None:
+            self.inotify.close()
+        self.inotify = None
+        self.directories = {}
+
+
+    def schedule(self):
+        """Schedule the next check."""
+        interval = self.EVENT_INTERVAL if self.inotify else self.POLL_INTERVAL
+        self.after_id = self.root.after(interval, self.poll)
+
+
+    def poll(self):
+        """Check the watched files and report the ones that changed."""
+        if self.inotify is not None:
+            candidates = self.inotify.read_paths() & self.files.keys()
+        else:
+            candidates = list(self.files)
+
+        changed = []
+        for path in candidates:
+            identity = get_identity(path)
+            if identity != self.files[path]:
+                self.files[path] = identity
+                changed.append(path)
+
+        for path in changed:
+            self.callback(path)
+
+        self.schedule()
+
+
+    def stop(self):
+        """Stop watching every file."""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.stop_inotify()
+        self.files = {}
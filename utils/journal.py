@@ -0,0 +1,245 @@
+"""Module for keeping the checked boxes and selected tabs between sessions.
+
+This module contains the SessionJournal class, which records every change to
+the checked boxes and the selected tabs of the body frame. Changes are
+applied to the state in memory at once and appended to a journal file in
+batches by a worker thread, so a click never waits on the disk. Once the
+journal holds enough records, the worker compacts it into a snapshot of the
+state and starts a new journal, which keeps restoring fast no matter how
+many changes were made.
+
+Records are idempotent, so a journal replayed on top of a snapshot it was
+already compacted into gives the same state.
+
+Classes:
+    SessionJournal: Records the session state through a write-behind journal.
+
+Functions:
+    apply_record: Apply one journal record to a state.
+    read_state: Read the state from a snapshot and its journal.
+
+Usage:
+    Create a SessionJournal with the Tk root and call load before the body
+    frame is built. Call the record methods on every change, look the state
+    up with checked_labels and selected_tab, and call close on exit to write
+    the changes that are still pending.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from utils.constants import (SESSION_COMPACT_RECORDS, SESSION_FLUSH_INTERVAL,
+                             SESSION_JOURNAL_FILE, SESSION_SNAPSHOT_FILE)
+
+
+def new_state() -> dict:
+    """Return an empty state."""
+    return {
+        "checked": {},  # {(pane, path, tab): {checkbox label, ...}}
+        "selected": {}  # {(pane, path): tab}
+        }
+
+
+def apply_record(state:dict, record:dict):
+    """
+    Apply one journal record to a state.
+
+    Args:
+    - state (dict): The state returned by new_state.
+    - record (dict): {"op": "check", "pane", "path", "tab", "label", "value"},
+      {"op": "clear", "pane", "path", "tab"} or
+      {"op": "select", "pane", "path", "tab"}.
+    """
+    key = (record["pane"], record["path"], record["tab"])
+    if record["op"] == "check":
+        labels = state["checked"].setdefault(key, set())
+        if record["value"]:
+            labels.add(record["label"])
+        else:
+            labels.discard(record["label"])
+        if not labels:
+            del state["checked"][key]
+    elif record["op"] == "clear":
+        state["checked"].pop(key, None)
+    elif record["op"] == "select":
+        state["selected"][key[:2]] = record["tab"]
+
+
+def read_state(snapshot_path:str, journal_path:str) -> tuple:
+    """
+    Read the state from a snapshot and replay the journal on top of it.
+    Missing files and damaged lines, such as a line cut short by a crash,
+    are skipped.
+
+    Returns:
+    - tuple: (state, number of records in the journal)
+    """
+    state = new_state()
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as file:
+            snapshot = json.load(file)
+        for pane, path, tab, labels in snapshot["checked"]:
+            state["checked"][(pane, path, tab)] = set(labels)
+        for pane, path, tab in snapshot["selected"]:
+            state["selected"][(pane, path)] = tab
+    except (OSError, ValueError, KeyError, TypeError):
+        state = new_state()
+
+    records = 0
+    try:
+        with open(journal_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    apply_record(state, json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    continue
+                records += 1
+    except OSError:
+        pass
+    return state, records
+
+
+def write_snapshot(path:str, state:dict):
+    """Atomically write the snapshot of a state to path."""
+    snapshot = {
+        "checked": [[*key, sorted(labels)] for key, labels in state["checked"].items()],
+        "selected": [[*key, tab] for key, tab in state["selected"].items()]
+        }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+class SessionJournal:
+    """Records the session state through a write-behind journal."""
+    def __init__(self, root, journal_path:str=SESSION_JOURNAL_FILE,
+                 snapshot_path:str=SESSION_SNAPSHOT_FILE):
+        self.root = root
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.state = new_state()
+        self.pending = []           # Records not handed to the worker yet.
+        self.flush_scheduled = False
+        self.journal_records = 0    # Only used by the worker after load.
+        self.write_errors = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+
+
+    def load(self):
+        """Restore the state written by earlier sessions."""
+        self.state, self.journal_records = read_state(self.snapshot_path, self.journal_path)
+
+
+    def checked_labels(self, pane:int, path:str, tab:str) -> set:
+        """Return the labels of the checked boxes of a tab."""
+        return self.state["checked"].get((pane, os.path.abspath(path), tab), set())
+
+
+    def selected_tab(self, pane:int, path:str):
+        """Return the label of the tab last selected for a file, or None."""
+        return self.state["selected"].get((pane, os.path.abspath(path)))
+
+
+    def record_check(self, pane:int, path:str, tab:str, label:str, value:bool):
+        """Record that a box was checked or unchecked."""
+        self.record({"op": "check", "pane": pane, "path": os.path.abspath(path),
+                     "tab": tab, "label": label, "value": int(value)})
+
+
+    def record_clear(self, pane:int, path:str, tab:str):
+        """Record that every box of a tab was unchecked."""
+        if self.checked_labels(pane, path, tab):
+            self.record({"op": "clear", "pane": pane, "path": os.path.abspath(path),
+                         "tab": tab})
+
+
+    def record_select(self, pane:int, path:str, tab:str):
+        """Record that a tab was selected."""
+        if self.selected_tab(pane, path) != tab:
+            self.record({"op": "select", "pane": pane, "path": os.path.abspath(path),
+                         "tab": tab})
+
+
+    def record(self, record:dict):
+        """Apply a record to the state and queue it to be written."""
+        apply_record(self.state, record)
+        self.pending.append(record)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.root.after(SESSION_FLUSH_INTERVAL, self.flush)
+
+
+    def flush(self):
+        """Hand the pending records to the worker."""
+        self.flush_scheduled = False
+        if self.pending:
+            batch, self.pending = self.pending, []
+            self.executor.submit(self.write, batch)
+
+
+    def write(self, batch:list):
+        """Append a batch of records to the journal, run in the worker."""
+        try:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as file:
+                file.write("".join(json.dumps(record, ensure_ascii=False) + "\n"
+                                   for record in batch))
+            self.journal_records += len(batch)
+            if self.journal_records >= SESSION_COMPACT_RECORDS:
+                self.compact()
+        except OSError:
+            # A journal that cannot be written should never break reviewing.
+            self.write_errors += 1
+
+
+    def compact(self):
+        """Fold the journal into the snapshot, run in the worker."""
+        state, _ = read_state(self.snapshot_path, self.journal_path)
+        write_snapshot(self.snapshot_path, state)
+        # A crash before this line leaves records that are already in the
+        # snapshot, replaying them again changes nothing.
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self.journal_records = 0
+
+
+    def close(self):
+        """Write the pending records and wait for the worker to finish."""
+        self.flush()
+        self.executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    class TestRoot:
+        """Stands in for the Tk root, flushes are run by hand."""
+        def after(self, delay, function, *args):
+            """Does nothing."""
+
+    with tempfile.TemporaryDirectory() as test_directory:
+        test_journal = SessionJournal(TestRoot(),
+                                      os.path.join(test_directory, "session.jsonl"),
+                                      os.path.join(test_directory, "session.json"))
+        test_journal.load()
+        start = time.perf_counter()
+        for test_index in range(5000):
+            test_journal.record_check(0, "data/general.txt", "1", f"{test_index % 7}A",
+                                      test_index % 3 != 0)
+            if test_index % 100 == 0:
+                test_journal.flush()
+        test_journal.record_select(0, "data/general.txt", "2")
+        test_journal.close()
+        print(f"Recorded 5000 changes in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        restored = SessionJournal(TestRoot(), test_journal.journal_path,
+                                  test_journal.snapshot_path)
+        start = time.perf_counter()
+        restored.load()
+        print(f"Restored in {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{restored.journal_records} records replayed")
+        print(restored.state == test_journal.state,
+              sorted(restored.checked_labels(0, "data/general.txt", "1")),
+              restored.selected_tab(0, "data/general.txt"))
@@ -0,0 +1,69 @@
+"""Module for reacting to resized widgets once a resize has settled.
+
+This module contains the LayoutManager class, which listens for <Configure>
+events on the widgets it watches and runs their callbacks once no widget has
+changed size for a short time. Dragging the border of a window sends a burst
+of events, the callbacks run once at the end of it instead of for every one.
+Events that do not change the size of a widget, such as moves, are ignored.
+
+Classes:
+    LayoutManager: Runs resize callbacks once a burst of resizes settled.
+
+Usage:
+    Create an instance of the LayoutManager class with the Tk root and call
+    watch with every widget to follow and the function to call once it was
+    resized.
+"""
+
+
+class LayoutManager:
+    """Runs resize callbacks once a burst of resizes settled."""
+    DEBOUNCE_INTERVAL = 60
+    """The time in milliseconds without resizes after which callbacks run."""
+
+    def __init__(self, root, interval:int=DEBOUNCE_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.sizes = {}     # {widget path: (width, height)}
+        self.pending = {}   # {callback: None}, in the order they were resized.
+        self.after_id = None
+
+
+    def watch(self, widget, callback):
+        """Call callback() once widget was resized and the resize settled."""
+        widget.bind("<Configure>",
+                    lambda event: self.on_configure(event, widget, callback),
+                    add="+")
+
+
+    def on_configure(self, event, widget, callback):
+        """Schedule callback if widget changed size."""
+        if event.widget is not widget:
+            return  # A toplevel also receives the events of its children.
+        key = str(widget)
+        size = (event.width, event.height)
+        if self.sizes.get(key) == size:
+            return
+        self.sizes[key] = size
+        self.schedule(callback)
+
+
+    def schedule(self, callback):
+        """Run callback once no resize happened for the interval."""
+        self.pending[callback] = None
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+        self.after_id = self.root.after(self.interval, self.settle)
+
+
+    def settle(self):
+        """Run every pending callback."""
+        self.after_id = None
+        pending, self.pending = self.pending, {}
+        for callback in pending:
+            callback()
+
+
+    def forget(self, widget):
+        """Stop tracking the size of a destroyed widget."""
+        self.sizes.pop(str(widget), None)
@@ -0,0 +1,302 @@
+"""Module for lazily loading task files through a byte offset index.
+
+This module makes a single quick pass over a task file to record the byte
+offsets of every "# tab" and "# checkbox" marker. The checkbox labels and
+bodies of a tab are only read, through a memory map, the first time that tab
+is accessed. This keeps the cost of opening a file proportional to the number
+of tabs rather than to the total amount of text.
+
+The offsets are only valid for the file they were read from. A tab that is
+first read after its file changed finds itself again in a new index of the
+file if its bytes did not change, and otherwise reads as checkboxes saying
+that the file changed, until the file is loaded again.
+
+Classes:
+    LazyTaskData: Read-only mapping of tab labels to lazily loaded tabs.
+    LazyTab: Read-only sequence of (label, text) tuples loaded on first use.
+
+Functions:
+    index_task_data: Index a file and return its tabs as LazyTaskData.
+
+Usage:
+    Use index_task_data in place of load_task_data for large files. The
+    returned object can be used anywhere the dictionary returned by
+    load_task_data is expected.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+from collections.abc import Mapping, Sequence
+from utils import metrics
+from utils.file_watcher import get_identity
+from utils.load_data import describe_task_data, format_label, load_task_data
+
+MARKER_PATTERN = re.compile(rb"^(?:# tab|[^\n]{4}# checkbox)[^\n]*", re.MULTILINE)
+"""Matches every line that could open or close a tab or a checkbox."""
+
+OUTSIDE_TEXT_PATTERN = re.compile(rb"^(?![@>])[^\S\n]*\S", re.MULTILINE)
+"""Matches a line outside the tabs that is neither blank nor a category."""
+
+TEXT_PATTERN = re.compile(rb"\S")
+"""Matches text between the checkboxes of a tab."""
+
+LONE_CARRIAGE_RETURN_PATTERN = re.compile(rb"\r(?!\n)")
+"""Matches a line ending the marker patterns do not see."""
+
+UNINDENTED_LINE_PATTERN = re.compile(
+    rb"^(?!        |# tab|[^\n]{4}# checkbox)[^\S\n]*\S", re.MULTILINE)
+"""Matches a line of a tab that is not blank, fully indented or a marker."""
+
+
+class LazyTab(Sequence):
+    """Read-only sequence of (label, text) tuples loaded on first use."""
+    def __init__(self, directory:str, spans:list, digest:bytes, identity:tuple):
+        self.directory = directory
+        self.spans = spans  # [(label_start, label_end, body_start, body_end), ...]
+        self.digest = digest    # Hash of the bytes of the whole tab.
+        self.identity = identity    # (mtime, size) of the file spans point into.
+        self.checkboxes = None
+        self.changed = None     # Identity of a changed file the tab is not in.
+
+
+    def __len__(self):
+        return len(self.spans)
+
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+
+    @property
+    def loaded(self) -> bool:
+        """True if the checkboxes of this tab have been read."""
+        return self.checkboxes is not None
+
+
+    def load(self) -> list:
+        """
+        Read the labels and bodies of every checkbox in this tab.
+        Every item access goes through here, only an actual read is timed.
+        """
+        if self.checkboxes is not None:
+            return self.checkboxes
+        identity = get_identity(self.directory)
+        if identity != self.identity and not self.find_spans(identity):
+            return self.changed_checkboxes()
+        with metrics.span("load_lazy_tab", checkboxes=len(self.spans)):
+            try:
+                with open(self.directory, "rb") as file, \
+                        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    self.checkboxes = [
+                        (decode_label(buffer[label_start:label_end]),
+                         decode_body(buffer[body_start:body_end]))
+                        for label_start, label_end, body_start, body_end in self.spans
+                    ]
+            except (OSError, ValueError):
+                # The file changed again while it was read.
+                return self.changed_checkboxes()
+        return self.checkboxes
+
+
+    def find_spans(self, identity) -> bool:
+        """
+        Index the changed file again and take the spans of this tab from it.
+        Returns False if no tab of the file has the bytes of this tab.
+        """
+        if identity is None or identity == self.changed:
+            return False
+        data = index_task_data(self.directory)
+        for tab in getattr(data, "tabs", {}).values():
+            if tab.digest == self.digest:
+                self.spans, self.identity = tab.spans, tab.identity
+                return True
+        self.changed = identity
+        return False
+
+
+    def changed_checkboxes(self) -> list:
+        """Return checkboxes saying that the file changed, one per checkbox."""
+        return [("File changed", f"'{self.directory}' changed since this tab was "
+                                 "indexed, open the file again to see it")] * len(self)
+
+
+class LazyTaskData(Mapping):
+    """Read-only mapping of tab labels to lazily loaded tabs."""
+    def __init__(self, directory:str, tabs:dict, identity:tuple):
+        self.directory = directory
+        self.tabs = tabs
+        self.identity = identity    # (mtime, size) of the file when indexed.
+
+
+    def __getitem__(self, key):
+        return self.tabs[key]
+
+
+    def __iter__(self):
+        return iter(self.tabs)
+
+
+    def __len__(self):
+        return len(self.tabs)
+
+
+    def is_stale(self) -> bool:
+        """True if the file has changed since it was indexed."""
+        return get_identity(self.directory) != self.identity
+
+
+@metrics.timed("index_task_data", describe_task_data)
+def index_task_data(directory:str, previous=None):
+    """
+    Index a file and return its tabs without reading checkbox text.
+
+    Files that are not valid, such as a file in which a "# tab" marker
+    appears inside an open checkbox, a body line lacks the full indent or
+    text sits outside the checkboxes, are loaded with load_task_data
+    instead, which keeps their valid tabs and lists their problems. Only
+    the text between the markers is scanned for this, none of it decoded.
+
+    Args:
+    - directory (str): The directory path of the file.
+    - previous (LazyTaskData): An earlier index of the same file. Its tabs
+      are reused, without being read again, if their bytes did not change.
+
+    Returns:
+    - LazyTaskData: The indexed tabs, or the data returned by load_task_data
+      if the file is missing or of an invalid format.
+    """
+
+    # Let the eager loader report invalid paths.
+    if not os.path.isfile(directory):
+        return load_task_data(directory)
+
+    identity = get_identity(directory)
+    if identity is None or identity[1] == 0:
+        return load_task_data(directory)
+
+    tabs = {}
+
+    # Track if a tab or checkbox is being processed.
+    tab = False
+    checkbox = False
+
+    # Store the current tab label and the spans of its checkboxes.
+    tab_label = ""
+    tab_start = 0
+    label_span = (0, 0)
+    spans = []
+    previous_end = 0    # End of the previous marker line.
+
+    with open(directory, "rb") as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer, \
+            memoryview(buffer) as view:
+        if LONE_CARRIAGE_RETURN_PATTERN.search(buffer):
+            return load_task_data(directory)
+        for match in MARKER_PATTERN.finditer(buffer):
+            line = match.group()
+            start = match.start()
+
+            # Check if the line indicates a new tab.
+            if line.startswith(b"# tab"):
+                if checkbox:
+                    return load_task_data(directory)
+                if not tab:
+                    if OUTSIDE_TEXT_PATTERN.search(buffer, previous_end, start):
+                        return load_task_data(directory)
+                    tab_label = format_label(line[5:].decode("utf-8"))
+                    tab_start = start
+                else:
+                    if line[5:].strip() or tab_label in tabs or TEXT_PATTERN.search(
+                            buffer, previous_end, start) or UNINDENTED_LINE_PATTERN.search(
+                                buffer, tab_start, start):
+                        return load_task_data(directory)
+                    digest = hashlib.blake2b(view[tab_start:match.end()],
+                                             digest_size=16).digest()
+                    tabs[tab_label] = (spans, digest)
+                    spans = []
+                tab = not tab
+                previous_end = match.end()
+                continue
+
+            if not tab:
+                # A checkbox marker outside of a tab.
+                return load_task_data(directory)
+
+            if not checkbox:
+                if TEXT_PATTERN.search(buffer, previous_end, start):
+                    return load_task_data(directory)
+                label_span = (match.start() + 14, match.end())
+                body_start = match.end() + 1
+            else:
+                spans.append((*label_span, body_start, match.start()))
+                if line[14:].strip() or not is_valid_span(
+                        buffer, *label_span, body_start, match.start()):
+                    return load_task_data(directory)
+            checkbox = not checkbox
+            previous_end = match.end()
+
+        if tab or OUTSIDE_TEXT_PATTERN.search(buffer, previous_end):
+            return load_task_data(directory)
+
+    if not tabs or not all(label and spans for label, (spans, _) in tabs.items()):
+        return load_task_data(directory)
+
+    previous_tabs = {}
+    if isinstance(previous, LazyTaskData) and previous.directory == directory:
+        previous_tabs = previous.tabs
+
+    lazy_tabs = {}
+    for label, (spans, digest) in tabs.items():
+        lazy_tab = previous_tabs.get(label)
+        if lazy_tab is not None and lazy_tab.digest == digest:
+            # Unchanged tab, only its offsets may have moved.
+            lazy_tab.spans = spans
+            lazy_tab.identity = identity
+        else:
+            lazy_tab = LazyTab(directory, spans, digest, identity)
+        lazy_tabs[label] = lazy_tab
+
+    return LazyTaskData(directory, lazy_tabs, identity)
+
+
+def is_valid_span(buffer, label_start, label_end, body_start, body_end) -> bool:
+    """
+    Returns True if a checkbox has a label and a non-empty body.
+
+    Only the label and the first line of the body are inspected, mirroring
+    the rules applied by ensure_data_integrity.
+    """
+    if not buffer[label_start:label_end].strip():
+        return False
+    if body_start >= body_end:
+        return False
+    # A body with more than one line always joins to a non-empty string.
+    if buffer.find(b"\n", body_start, body_end - 1) != -1:
+        return True
+    return decode_body(buffer[body_start:body_end]) != ""
+
+
+def decode_label(label:bytes) -> str:
+    """Decode a checkbox label read from the file."""
+    return format_label(label.decode("utf-8"))
+
+
+def decode_body(body:bytes) -> str:
+    """Decode a checkbox body, dropping the indentation of every line."""
+    text = body.decode("utf-8").replace("\r\n", "\n")
+    if text.endswith("\n"):
+        text = text[:-1]
+    return "\n".join(line[8:] for line in text.split("\n"))
+
+
+if __name__ == "__main__":
+    # Compare the lazy loader against the eager loader.
+    for test_directory in ("data/buttons.txt", "data/general.txt",
+                           "data/test_file_1.txt", "data/invalid_file.txt",
+                           "data"):
+        eager = load_task_data(test_directory)
+        lazy = index_task_data(test_directory)
+        lazy = {key: list(value) for key, value in lazy.items()}
+        print(f"{test_directory}: {'OK' if eager == lazy else 'MISMATCH'}")
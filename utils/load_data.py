@@ -2,11 +2,32 @@
 
 This module contains functions for loading data from text files into a nested
 dictionary structure. The data in the text files is formatted to represent tabs
-and checkboxes, which are then stored in the dictionary.
+and checkboxes, which are then stored in the dictionary. Once validated, the
+dictionary is turned into the compact TaskData model of utils.task_model.
+
+Three parsers produce the same data from valid files: "line" reads the file
+line by line, "buffer" reads it as one buffer and splits it on its markers
+with regular expressions, which is faster on large files, and "validating"
+checks every line while it parses it. Where the line parser rejects a
+malformed file as a whole, the validating parser keeps the tabs that are
+valid and adds an "ERROR" tab listing a Diagnostic for every problem, with
+its line and column. The buffer parser hands every file it cannot take its
+fast path on to the validating parser. The parser is chosen with
+set_default_parser or per call.
+
+Classes:
+    Diagnostic: A problem found in a file, with its position.
 
 Functions:
     load_task_data: Load data from a file into a nested dictionary.
+    load_task_lines: Load a file with the line parser.
+    load_task_buffer: Load a file with the buffer parser.
+    load_task_tokens: Load a file with the validating parser.
+    parse_task_lines: Parse a file line by line.
+    tokenize_task_lines: Parse and check lines, collecting diagnostics.
+    set_default_parser: Choose the parser used by load_task_data.
     format_label: Format label by removing keywords and hashtags.
+    describe_task_data: Describe loaded data for timing spans.
 
 Usage:
     Use the load_task_data function to load data from a text file into a
@@ -14,28 +35,102 @@ Usage:
     labels by removing keywords and hashtags.
 """
 
+import hashlib
+import itertools
 import os
+import re
+import sys
+from utils import metrics
+from utils.constants import CATEGORY_MARKER, SUB_CATEGORY_MARKER
+from utils.task_model import TaskData
 
+TAB_MARKER_PATTERN = re.compile(rb"\n# tab([^\n]*)")
+"""Matches a line opening or closing a tab, after the newline before it."""
 
-def load_task_data(directory:str) -> dict:
+CHECKBOX_MARKER_PATTERN = re.compile(rb"\n[\x00-\x09\x0b-\x7f]{4}# checkbox([^\n]*)")
+"""Matches a line opening or closing a checkbox, after the newline before it."""
+
+BODY_INDENT = b"\n" + b" " * 8
+"""A newline followed by the indent removed from every line of a body."""
+
+UNINDENTED_LINE_PATTERN = re.compile(rb"\n(?!        |\n|\x00|\Z)")
+"""Matches a line that is neither blank nor fully indented, after its newline."""
+
+OUTSIDE_TEXT_PATTERN = re.compile(rb"\n(?![@>])[^\S\n]*\S")
+"""Matches a line outside the tabs that is neither blank nor a category."""
+
+LABEL_SPACE_PATTERN = re.compile(r"[^\S\n]+")
+"""Matches a run of whitespace within a line, collapsed as by format_label."""
+
+ERROR_TAB = "ERROR "
+"""The label of the tab listing the problems found in a file. It ends with a
+space, which format_label strips from every label read from a file, so it
+never replaces a tab of the file labeled "ERROR"."""
+
+MAX_LISTED_DIAGNOSTICS = 100
+"""The number of diagnostics listed in the error tab, the rest are counted."""
+
+
+def describe_task_data(data, directory:str, *args, **kwargs) -> dict:
+    """Returns the path, size, tab count and checkbox count of loaded data."""
+    try:
+        size = os.path.getsize(directory)
+    except OSError:
+        size = 0
+    return {
+        "path": directory,
+        "bytes": size,
+        "tabs": len(data),
+        "checkboxes": sum(len(checkboxes) for checkboxes in data.values())
+        }
+
+
+@metrics.timed("load_task_data", describe_task_data)
+def load_task_data(directory:str, parser:str=None, previous=None) -> dict:
     """
     Load data from a file into a nested dictionary.
 
     Args:
     - directory (str): The directory path of the file.
+    - parser (str): The name of the parser to use, see PARSERS. The default
+      parser is used if None.
+    - previous (TaskData): An earlier load of the same file. The buffer
+      parser reuses its tabs, without parsing them again, if their bytes
+      did not change.
 
     Returns:
-    - dict: A nested dictionary containing the loaded data.
+    - TaskData: A mapping of tab labels to their (label, text) checkboxes.
     """
 
     # Ensure that there is a valid file at directory.
     if not os.path.isfile(directory):
-        return {
+        return TaskData.from_dict({
             "ERROR": [
                 (f"Invalid file at '{directory}'","Not a valid directory")
                 ]
-            }
+            })
+
+    parser = parser or default_parser
+    if previous is not None and parser == "buffer":
+        return load_task_buffer(directory, previous)
+    return PARSERS[parser](directory)
+
+
+def load_task_lines(directory:str) -> TaskData:
+    """Load a file with parse_task_lines, then check and build the model."""
+    return TaskData.from_dict(ensure_data_integrity(parse_task_lines(directory)))
 
+
+def parse_task_lines(directory:str) -> dict:
+    """
+    Parse a file line by line.
+
+    Args:
+    - directory (str): The directory path of the file.
+
+    Returns:
+    - dict: {tab label: [(checkbox label, text), ...], ...}, unchecked.
+    """
     data_dict = {}
 
      # Track if a tab or checkbox is being processed.
@@ -83,9 +178,321 @@ def load_task_data(directory:str) -> dict:
                 # Save the checkbox text.
                 text.append(line[8:].strip("\n"))
 
-    return ensure_data_integrity(data_dict)
+    return data_dict
+
 
+def load_task_buffer(directory:str, previous=None) -> TaskData:
+    """
+    Load a file read as one buffer, returning the same as load_task_lines.
+
+    The file is split on its tab markers, then every tab on its checkbox
+    markers, with regular expressions. The bodies of a tab are unindented
+    with one replace over all of them and stay encoded, as TaskData keeps
+    them. Files this cannot handle exactly, such as a checkbox left open
+    when its tab closes, a marker after non-ASCII characters, a body line
+    without the full indent, text outside the checkboxes, a closing marker
+    with a label, an empty label or body, or a repeated tab label, are
+    handed to load_task_tokens. Blank lines in bodies and category lines
+    outside the tabs are fine.
+
+    Every tab keeps a hash of its bytes. Tabs of previous with the same
+    label and hash are taken over as they are, so reloading a changed
+    file only parses the tabs that changed.
 
+    Args:
+    - directory (str): The directory path of the file.
+    - previous (TaskData): An earlier load of the same file, or None.
+
+    Returns:
+    - TaskData: A mapping of tab labels to their (label, text) checkboxes.
+    """
+    with open(directory, "rb") as file:
+        buffer = file.read()
+    if b"\r" in buffer:
+        # Translate line endings as reading in text mode does.
+        buffer = buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if not buffer.isascii():
+        buffer.decode("utf-8")  # Fail on invalid files as load_task_lines does.
+
+    # [before, label, tab, closing line, between, label, tab, ..., after]
+    parts = TAB_MARKER_PATTERN.split(b"\n" + buffer)
+    end = len(parts) - 1
+    if end == 0 or end % 4 or b"\x00" in buffer or any(
+            label.strip() for label in parts[3::4]) or any(
+            OUTSIDE_TEXT_PATTERN.search(gap) for gap in parts[0::4]):
+        return load_task_tokens(directory)
+
+    previous_tabs = previous.labels if isinstance(previous, TaskData) else {}
+    reused = []     # [(index, previous tab), ...]
+    seen = set()    # The labels of the tabs so far.
+    layout = []
+    digests = []
+    chunks = []
+    position = 0
+    for raw_label, tab in zip(parts[1:end:4], parts[2:end:4]):
+        digest = hashlib.blake2b(raw_label, digest_size=16)
+        digest.update(tab)
+        digest = digest.digest()
+        tab_label = format_label(raw_label.decode("utf-8"))
+        previous_tab = previous_tabs.get(tab_label)
+        if previous_tab is not None and previous_tab.digest == digest and (
+                tab_label not in seen):
+            # Unchanged tab, copy its texts out of the previous buffer.
+            start = previous_tab.offsets[0]
+            offsets = [offset - start + position for offset in previous_tab.offsets]
+            reused.append((len(layout), previous_tab))
+            seen.add(tab_label)
+            layout.append((previous_tab.label, previous_tab.labels, offsets))
+            digests.append(digest)
+            chunks.append(previous_tab.buffer[start:previous_tab.offsets[-1]])
+            position = offsets[-1]
+            continue
+
+        # [before, label, body, closing line, between, label, body, ...]
+        pieces = CHECKBOX_MARKER_PATTERN.split(tab)
+        markers = (len(pieces) - 1) // 2
+        if markers % 2 or tab.count(b"# checkbox") != markers or any(
+                piece.strip() for piece in pieces[0::4]) or any(
+                label.strip() for label in pieces[3::4]):
+            return load_task_tokens(directory)
+
+        # Every body starts with the newline ending its opening marker.
+        bodies = pieces[2::4]
+        joined = b"\x00".join(bodies)
+        if not all(bodies) or UNINDENTED_LINE_PATTERN.search(joined):
+            return load_task_tokens(directory)
+        texts = joined.replace(BODY_INDENT, b"\n")[1:].split(b"\x00\n")
+
+        # Format every label of the tab at once, one label per line.
+        labels = LABEL_SPACE_PATTERN.sub(" ", b"\n".join(pieces[1::4]).decode("utf-8"))
+        labels = tuple(map(sys.intern, labels.replace(" \n", "\n")
+                                            .replace("\n ", "\n")
+                                            .strip(" ")
+                                            .split("\n")))
+        if not tab_label or not all(labels) or not all(texts) or tab_label in seen:
+            return load_task_tokens(directory)
+        seen.add(tab_label)
+
+        offsets = list(itertools.accumulate(map(len, texts), initial=position))
+        position = offsets[-1]
+        layout.append((sys.intern(tab_label), labels, offsets))
+        digests.append(digest)
+        chunks.extend(texts)
+
+    data = TaskData.from_layout(layout, b"".join(chunks), digests)
+    for index, previous_tab in reused:
+        # The texts are the same, so are their templates.
+        data.tab(index).templates = previous_tab.templates
+    return data
+
+
+class Diagnostic:
+    """A problem found in a file, with its position."""
+    __slots__ = ("line", "column", "message", "expected", "unclosed")
+
+    def __init__(self, line:int, column:int, message:str, expected:str,
+                 unclosed:str=None):
+        self.line = line            # 1-based.
+        self.column = column        # 1-based.
+        self.message = message
+        self.expected = expected    # What would have made the line valid.
+        self.unclosed = unclosed    # The label of the tab or checkbox left open.
+
+
+    def as_checkbox(self) -> tuple:
+        """Return the (label, text) checkbox listing the problem."""
+        return (f"Line {self.line}, column {self.column}: {self.message}",
+                f"Expected {self.expected}")
+
+
+    def __repr__(self):
+        return (f"Diagnostic({self.line}, {self.column}, {self.message!r}, "
+                f"{self.expected!r}, {self.unclosed!r})")
+
+
+def load_task_tokens(directory:str) -> TaskData:
+    """
+    Load a file with tokenize_task_lines. The valid tabs are kept and, if
+    the file has problems, followed by an "ERROR" tab listing them.
+    """
+    with open(directory, "r", encoding="utf-8") as file:
+        data, diagnostics = tokenize_task_lines(file)
+    if diagnostics:
+        errors = [diagnostic.as_checkbox()
+                  for diagnostic in diagnostics[:MAX_LISTED_DIAGNOSTICS]]
+        if len(diagnostics) > MAX_LISTED_DIAGNOSTICS:
+            errors.append((f"{len(diagnostics) - MAX_LISTED_DIAGNOSTICS} more problems",
+                           "Fix the problems above and reload the file"))
+        data[ERROR_TAB] = errors
+    return TaskData.from_dict(data)
+
+
+@metrics.timed("tokenize_task_lines",
+               lambda result, lines: {"tabs": len(result[0]), "diagnostics": len(result[1])})
+def tokenize_task_lines(lines) -> tuple:
+    """
+    Parse lines in one pass, checking every line as it is read.
+
+    Valid files give the same data as parse_task_lines followed by
+    ensure_data_integrity. On a problem a Diagnostic is collected and the
+    parser recovers instead of giving up: a tab or checkbox left open is
+    closed, a closing marker with a label is read as closing the open one
+    and opening a new one, a marker at the wrong column is read as a
+    marker, and a body line without the full indent is kept. Checkboxes
+    without text, tabs without checkboxes and repeated tabs are dropped.
+
+    Args:
+    - lines (iterable): The lines of the file, such as an open text file.
+
+    Returns:
+    - tuple: ({tab label: [(checkbox label, text), ...], ...} of the valid
+      tabs, [Diagnostic, ...] in the order they were found)
+    """
+    data = {}
+    diagnostics = []
+
+    # The open tab and checkbox, None while outside of them.
+    tab_label = None
+    tab_line = 0
+    checkbox_label = None
+    checkbox_line = 0
+
+    # Store checkbox items and text lines.
+    checkboxes = []
+    text = []
+
+    def report(line, column, message, expected, unclosed=None):
+        diagnostics.append(Diagnostic(line, column, message, expected, unclosed))
+
+    def close_checkbox():
+        nonlocal checkbox_label, text
+        body = "\n".join(text)
+        if body:
+            checkboxes.append((checkbox_label, body))
+        else:
+            report(checkbox_line, 5, f"Checkbox '{checkbox_label}' has no text",
+                   "text lines indented by 8 spaces")
+        checkbox_label = None
+        text = []
+
+    def close_tab(number=None):
+        # number is the line of the closing marker, None at the end of the file.
+        nonlocal tab_label, checkboxes
+        if checkbox_label is None:
+            pass
+        elif number is None:
+            report(checkbox_line, 5, f"Checkbox '{checkbox_label}' is not closed",
+                   "'    # checkbox' at the end of the checkbox", checkbox_label)
+            close_checkbox()
+        else:
+            report(number, 1, f"Checkbox '{checkbox_label}' from line {checkbox_line} "
+                   "is not closed", "'    # checkbox' before '# tab'", checkbox_label)
+            close_checkbox()
+        if not checkboxes:
+            report(tab_line, 1, f"Tab '{tab_label}' has no checkboxes",
+                   "'    # checkbox <label>'")
+        elif tab_label in data:
+            report(tab_line, 1, f"Tab '{tab_label}' is repeated", "a new tab label")
+        else:
+            data[tab_label] = checkboxes
+        tab_label = None
+        checkboxes = []
+
+    def checkbox_marker(number, column, label):
+        nonlocal checkbox_label, checkbox_line
+        if checkbox_label is not None:
+            if label:
+                report(number, column, f"Checkbox '{checkbox_label}' from line "
+                       f"{checkbox_line} is not closed", "'    # checkbox' before "
+                       "the next checkbox", checkbox_label)
+            close_checkbox()
+            if not label:
+                return
+        elif not label:
+            report(number, column, "Closing a checkbox that is not open",
+                   "'    # checkbox <label>'")
+            return
+        checkbox_label = label
+        checkbox_line = number
+
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+
+        # Check if the line indicates a new tab.
+        if line.startswith("# tab"):
+            label = format_label(line[5:])
+            if tab_label is not None:
+                if label:
+                    report(number, 1, f"Tab '{tab_label}' from line {tab_line} is "
+                           "not closed", "'# tab' before the next tab", tab_label)
+                close_tab(number)
+                if not label:
+                    continue
+            elif not label:
+                report(number, 1, "Closing a tab that is not open", "'# tab <label>'")
+                continue
+            tab_label = label
+            tab_line = number
+            continue
+
+        if tab_label is None:
+            if line.strip() and not line.startswith((CATEGORY_MARKER, SUB_CATEGORY_MARKER)):
+                report(number, len(line) - len(line.lstrip()) + 1, "Text outside a tab",
+                       "'# tab <label>' before it")
+            continue
+
+        # Check if the line indicates a new checkbox.
+        if line.startswith("# checkbox", 4):
+            checkbox_marker(number, 5, format_label(line[14:]))
+            continue
+
+        if checkbox_label is not None and (line.startswith("        ") or not line.strip()):
+            # Save the checkbox text.
+            text.append(line[8:])
+            continue
+
+        stripped = line.lstrip()
+        column = len(line) - len(stripped) + 1
+        if stripped.startswith("# checkbox"):
+            report(number, column, f"Checkbox marker at column {column}",
+                   "'# checkbox' at column 5")
+            checkbox_marker(number, column, format_label(stripped[10:]))
+        elif checkbox_label is not None:
+            report(number, column, "Text not indented by 8 spaces",
+                   "8 spaces before the text", checkbox_label)
+            text.append(stripped)
+        elif stripped:
+            report(number, column, "Text outside a checkbox",
+                   "'    # checkbox <label>' before it", tab_label)
+
+    if tab_label is not None:
+        report(tab_line, 1, f"Tab '{tab_label}' is not closed",
+               "'# tab' at the end of the tab", tab_label)
+        close_tab()
+    if not data and not diagnostics:
+        report(1, 1, "No tabs found", "'# tab <label>'")
+    # Problems found on closing are reported at the line they were opened.
+    diagnostics.sort(key=lambda diagnostic: (diagnostic.line, diagnostic.column))
+    return data, diagnostics
+
+
+PARSERS = {"line": load_task_lines, "buffer": load_task_buffer,
+           "validating": load_task_tokens}
+"""The parsers load_task_data can use, by name."""
+
+default_parser = "buffer"   # pylint: disable=invalid-name
+
+
+def set_default_parser(name:str):
+    """Choose the parser used by load_task_data, one of PARSERS."""
+    global default_parser  # pylint: disable=global-statement
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser '{name}', expected one of {list(PARSERS)}")
+    default_parser = name
+
+
+@metrics.timed("ensure_data_integrity",
+               lambda result, data: {"tabs": len(data)})
 def ensure_data_integrity(data):
     """
     Ensure that each item in the given data is of the format:
@@ -158,3 +565,24 @@ if __name__ == "__main__":
     test_data = load_task_data("data")
     for _key, _value in test_data.items():
         print("Output 4: ", "{", f"{_key}: ", _value, "}", sep="")
+    print("-"*10)
+
+    # Recover the valid tabs of a malformed file.
+    test_data, test_diagnostics = tokenize_task_lines([
+        "# tab Kept\n", "    # checkbox A\n", "        Text\n", "    # checkbox\n",
+        "# tab\n", "# tab Open\n", "    # checkbox B\n", "      Short indent\n",
+        "    # checkbox C\n", "        Text\n"])
+    print("Output 5:", test_data)
+    for test_diagnostic in test_diagnostics:
+        print("Output 5:", test_diagnostic)
+    print("-"*10)
+
+    # Compare the parsers, see benchmarks/compare_parsers.py for more files.
+    for test_path in ("data/buttons.txt", "data/general.txt",
+                      "data/test_file_1.txt"):
+        same = load_task_data(test_path, "line") == load_task_data(test_path, "buffer") \
+            == load_task_data(test_path, "validating")
+        print(f"Parsers on {test_path}: {'OK' if same else 'MISMATCH'}")
+    same = load_task_data("data/invalid_file.txt", "buffer") == \
+        load_task_data("data/invalid_file.txt", "validating")
+    print(f"Parsers on data/invalid_file.txt: {'OK' if same else 'MISMATCH'}")
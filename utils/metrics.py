@@ -0,0 +1,190 @@
+"""Module for recording timing spans of the load, render and copy paths.
+
+This module records how long named operations take, together with item
+counts and bytes read, into an in-memory ring buffer. Recording is switched
+off by default, in which case span returns a shared object that does nothing,
+so instrumented code costs close to nothing.
+
+Functions:
+    enable: Start recording spans.
+    disable: Stop recording spans.
+    is_enabled: Returns True if spans are being recorded.
+    span: Return a context manager timing a named operation.
+    timed: Decorator recording a span for every call of a function.
+    get_records: Return a copy of the recorded spans.
+    summarize: Return the count, mean and maximum duration per name.
+    export_jsonl: Append the recorded spans to a JSON lines file.
+
+Usage:
+    Wrap an operation in a span and attach counts when recording:
+        with metrics.span("load_task_data", path=path) as timing:
+            data = parse(path)
+            if timing:
+                timing.set(tabs=len(data))
+"""
+
+import collections
+import functools
+import json
+import threading
+import time
+
+DEFAULT_CAPACITY = 2000
+"""The number of spans kept in the ring buffer."""
+
+_records = collections.deque(maxlen=DEFAULT_CAPACITY)
+_enabled = False
+
+
+class Span:
+    """Times a named operation and records it when it ends."""
+    __slots__ = ("record", "start")
+
+    def __init__(self, name:str, fields:dict):
+        self.record = {"name": name, **fields}
+        self.start = 0.0
+
+
+    def __bool__(self):
+        return True
+
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.record["duration"] = time.perf_counter() - self.start
+        self.record["time"] = time.time()
+        self.record["thread"] = threading.current_thread().name
+        if exc_type is not None:
+            self.record["error"] = exc_type.__name__
+        _records.append(self.record)
+        return False
+
+
+    def set(self, **fields):
+        """Attach counts or other values to the span."""
+        self.record.update(fields)
+
+
+class NullSpan:
+    """Span used while recording is off, it does nothing."""
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+    def set(self, **fields):
+        """Does nothing."""
+
+
+NULL_SPAN = NullSpan()
+
+
+def enable(capacity:int=DEFAULT_CAPACITY):
+    """Start recording spans, keeping the latest capacity of them."""
+    global _enabled, _records  # pylint: disable=global-statement
+    if capacity != _records.maxlen:
+        _records = collections.deque(_records, maxlen=capacity)
+    _enabled = True
+
+
+def disable():
+    """Stop recording spans."""
+    global _enabled  # pylint: disable=global-statement
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """Returns True if spans are being recorded."""
+    return _enabled
+
+
+def span(name:str, **fields):
+    """
+    Return a context manager timing a named operation.
+
+    Args:
+    - name (str): The name of the operation.
+    - fields: Values to store with the span, such as a path.
+
+    Returns:
+    - Span: A span that is recorded when it ends, or NULL_SPAN, which is
+      falsy, if recording is off.
+    """
+    if not _enabled:
+        return NULL_SPAN
+    return Span(name, fields)
+
+
+def timed(name:str, describe=None):
+    """
+    Decorator recording a span for every call of a function.
+
+    Args:
+    - name (str): The name of the span.
+    - describe (callable): Called with the result and the arguments of the
+      function after it returned, it returns the fields to store.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with Span(name, {}) as timing:
+                result = function(*args, **kwargs)
+            # Counting happens outside of the timing.
+            if describe is not None:
+                timing.set(**describe(result, *args, **kwargs))
+            return result
+        return wrapper
+    return decorator
+
+
+def get_records() -> list:
+    """Return a copy of the recorded spans, oldest first."""
+    return list(_records)
+
+
+def clear():
+    """Remove every recorded span."""
+    _records.clear()
+
+
+def summarize() -> dict:
+    """Return {name: {"count", "mean", "max"}} of the recorded spans."""
+    durations = collections.defaultdict(list)
+    for record in get_records():
+        durations[record["name"]].append(record["duration"])
+    return {
+        name: {"count": len(values),
+               "mean": sum(values) / len(values),
+               "max": max(values)}
+        for name, values in durations.items()
+        }
+
+
+def export_jsonl(path:str) -> int:
+    """
+    Append the recorded spans to a JSON lines file.
+
+    Returns:
+    - int: The number of spans written.
+    """
+    records = get_records()
+    with open(path, "a", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False, default=str))
+            file.write("\n")
+    return len(records)
@@ -0,0 +1,166 @@
+"""Module for completing paths of review files.
+
+This module contains the PathIndex class, an in-memory index of every review
+file under a directory. The index remembers the modification time of every
+folder, so refreshing it only lists the folders whose content changed instead
+of walking the whole tree again. Completions are looked up by prefix with a
+binary search, then by fuzzy subsequence matching with one regular
+expression over the keys of every path joined into one text.
+
+Classes:
+    PathIndex: In-memory index of the review files under a directory.
+
+Usage:
+    Build an index with PathIndex(directory).refreshed(), ideally in a worker
+    thread, then call complete with the text typed so far. Call refreshed
+    again to pick up changes, it returns a new index and leaves the old one
+    untouched so the old one stays usable while the new one is built.
+"""
+
+import bisect
+import itertools
+import os
+import re
+from utils.constants import REVIEW_FILE_EXTENSION
+
+FUZZY_MATCH_LIMIT = 2000
+"""The number of fuzzy matches ranked, in path order, before the rest are skipped."""
+
+
+def normalize_key(path:str) -> str:
+    """Return the form of a path used for matching."""
+    return path.replace("\\", "/").lower()
+
+
+class PathIndex:
+    """In-memory index of the review files under a directory."""
+    def __init__(self, directory:str, folders:dict=None):
+        self.directory = directory
+        self.folders = folders or {}    # {folder: (mtime, subfolders, files)}
+
+        entries = sorted(
+            (normalize_key(path), path)
+            for path in (os.path.join(folder, name)
+                         for folder, (_, _, files) in self.folders.items()
+                         for name in files)
+            )
+        self.keys = [key for key, _ in entries]     # Sorted for bisect.
+        self.paths = [path for _, path in entries]
+
+        # Every key after a newline, searched at once by fuzzy_complete.
+        self.text = "".join(f"\n{key}" for key in self.keys)
+        self.starts = list(itertools.accumulate((len(key) + 1 for key in self.keys[:-1]),
+                                                initial=0))     # Of each newline.
+
+
+    def __len__(self):
+        return len(self.paths)
+
+
+    def refreshed(self):
+        """
+        Return a new index reflecting the files on disk.
+        Only the folders whose modification time changed are listed again.
+        """
+        folders = {}
+        pending = [self.directory]
+        while pending:
+            folder = pending.pop()
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+
+            known = self.folders.get(folder)
+            if known is not None and known[0] == mtime:
+                folders[folder] = known
+            else:
+                folders[folder] = self.list_folder(folder, mtime)
+            pending.extend(folders[folder][1])
+
+        return PathIndex(self.directory, folders)
+
+
+    @staticmethod
+    def list_folder(folder:str, mtime:int) -> tuple:
+        """Return (mtime, subfolders, files) of a folder."""
+        subfolders = []
+        files = []
+        try:
+            with os.scandir(folder) as scan:
+                for item in scan:
+                    if item.name.startswith("."):
+                        continue
+                    if item.is_dir():
+                        subfolders.append(item.path)
+                    elif item.name.endswith(f".{REVIEW_FILE_EXTENSION}"):
+                        files.append(item.name)
+        except OSError:
+            pass
+        return (mtime, subfolders, files)
+
+
+    def complete(self, text:str, limit:int=10) -> list:
+        """
+        Return up to limit paths completing text.
+        Paths starting with text come first, followed by paths containing
+        the characters of text in order.
+        """
+        key = normalize_key(text)
+        start = bisect.bisect_left(self.keys, key)
+        results = []
+        for index in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[index].startswith(key):
+                break
+            results.append(self.paths[index])
+
+        if len(results) < limit and key:
+            results.extend(self.fuzzy_complete(key, limit - len(results), set(results)))
+        return results
+
+
+    def fuzzy_complete(self, key:str, limit:int, exclude:set) -> list:
+        """Return up to limit paths containing the characters of key in order."""
+        pattern = fuzzy_pattern(key)
+        if pattern is None:
+            return []
+        matches = []
+        for match in itertools.islice(pattern.finditer(self.text), FUZZY_MATCH_LIMIT):
+            # Prefer tight matches, then short paths.
+            index = bisect.bisect_left(self.starts, match.start())
+            matches.append((match.end() - match.start(1),
+                            len(self.keys[index]),
+                            index))
+
+        results = []
+        for _, _, index in sorted(matches):
+            path = self.paths[index]
+            if path not in exclude:
+                results.append(path)
+                if len(results) == limit:
+                    break
+        return results
+
+
+def fuzzy_pattern(key:str):
+    """
+    Return a pattern matching a newline followed by a line that contains
+    the characters of key in order, or None if key holds a newline.
+
+    Each character is reached through a possessive run of other characters,
+    so a line is scanned once without backtracking and the match ends at
+    the first occurrence of key. The leading newline lets the search skip
+    to the start of the next line at once. The first character of key in
+    the line is group 1.
+    """
+    if "\n" in key:
+        return None
+    first, *rest = (re.escape(character) for character in key)
+    return re.compile(f"\n[^{first}\n]*+({first})"
+                      + "".join(f"[^{character}\n]*+{character}" for character in rest))
+
+
+if __name__ == "__main__":
+    test_index = PathIndex("data").refreshed()
+    for test_text in ("data/t", "data\\Test Folder\\", "sub3", "gen"):
+        print(f"{test_text!r}:", test_index.complete(test_text))
@@ -0,0 +1,229 @@
+"""Module for keeping parsed files in memory and loading the next ones early.
+
+This module contains the FileCache class, an in-memory LRU cache of parsed
+files bounded by their estimated size in bytes rather than by their number,
+and the Prefetcher class, which loads the files a reviewer is likely to open
+next in a worker thread: the siblings that follow the active file in its
+folder, and the files used recently.
+
+Only the entry being stored is estimated, the cache keeps a running total.
+Lazily indexed tabs are counted at the size of their text from the start,
+so that loading them later does not take the cache past its limit.
+Templates compiled after an entry is stored are counted when the file is
+stored again.
+
+Classes:
+    FileCache: Memory bounded LRU cache of parsed files.
+    Prefetcher: Loads likely next files into a FileCache in the background.
+
+Functions:
+    estimate_size: Estimate the memory used by loaded data.
+    list_siblings: Return the review files next to a file, in name order.
+
+Usage:
+    Create a FileCache, look files up with get before loading them and load
+    them through FileCache.load so that the result is stored. Create a
+    Prefetcher with the Tk root, the cache and the load function, and call
+    prefetch with the path of every file that is opened.
+"""
+
+import collections
+import os
+import sys
+import threading
+from utils import metrics
+from utils.background import BackgroundLoader
+from utils.constants import (FILE_CACHE_MEMORY_LIMIT, PREFETCH_NEXT_FILES,
+                             PREFETCH_RECENT_FILES, REVIEW_FILE_EXTENSION)
+from utils.file_watcher import get_identity
+from utils.lazy_load import LazyTab
+from utils.task_model import TaskData
+
+SPAN_SIZE = 120
+"""Estimated size in bytes of one span of a tab that has not been loaded."""
+
+CHECKBOX_SIZE = 2 * sys.getsizeof("")
+"""Estimated size in bytes of the two strings of a checkbox, without their text."""
+
+
+def estimate_size(data) -> int:
+    """Estimate the memory in bytes used by data returned by a loader."""
+    if isinstance(data, TaskData):
+        size = sys.getsizeof(data.buffer)
+        for tab in data.tabs:
+            size += sys.getsizeof(tab.offsets) + sys.getsizeof(tab.labels)
+            size += sum(sys.getsizeof(label) for label in tab.labels)
+            # A snapshot, the templates may be compiling in another thread.
+            templates = list((tab.templates or {}).values())
+            size += sum(sys.getsizeof(template.parts)
+                        + sum(sys.getsizeof(part) for part in template.parts)
+                        for template in templates)
+        return size
+
+    size = sys.getsizeof(data)
+    for label, checkboxes in data.items():
+        size += sys.getsizeof(label)
+        if isinstance(checkboxes, LazyTab):
+            # Counted from its spans whether loaded or not, reading the
+            # checkboxes of a lazy tab loads it.
+            size += sum(SPAN_SIZE + CHECKBOX_SIZE + label_end - label_start
+                        + body_end - body_start
+                        for label_start, label_end, body_start, body_end in checkboxes.spans)
+        else:
+            size += sum(sys.getsizeof(label) + sys.getsizeof(text)
+                        for label, text in checkboxes)
+    return size
+
+
+def list_siblings(path:str) -> list:
+    """Return the paths of the review files in the folder of path, by name."""
+    folder = os.path.dirname(path) or "."
+    try:
+        with os.scandir(folder) as scan:
+            names = sorted(item.name for item in scan
+                           if item.is_file()
+                           and item.name.endswith(f".{REVIEW_FILE_EXTENSION}"))
+    except OSError:
+        return []
+    return [os.path.join(os.path.dirname(path), name) for name in names]
+
+
+class FileCache:
+    """Memory bounded LRU cache of parsed files."""
+    def __init__(self, limit:int=FILE_CACHE_MEMORY_LIMIT):
+        self.limit = limit      # Maximum estimated size in bytes.
+        self.entries = collections.OrderedDict()  # {path: (identity, size, data)}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()    # Prefetching stores from a worker.
+
+
+    def __contains__(self, path):
+        entry = self.entries.get(os.path.normpath(path))
+        return entry is not None and entry[0] == get_identity(path)
+
+
+    def get(self, path:str):
+        """Return the cached data of path, or None if missing or outdated."""
+        key = os.path.normpath(path)
+        identity = get_identity(path)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != identity:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+
+    def put(self, path:str, identity, data):
+        """Store the data of path, loaded while the file had identity."""
+        key = os.path.normpath(path)
+        size = estimate_size(data)
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            if size > self.limit:
+                return
+            self.entries[key] = (identity, size, data)
+            self.size += size
+            while self.size > self.limit:
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+
+    def load(self, path:str, load, *args):
+        """
+        Load path with load(path, *args) and store the result.
+        Meant to run in a worker thread.
+        """
+        identity = get_identity(path)  # Taken first, a later change is caught.
+        data = load(path, *args)
+        if identity is not None:
+            self.put(path, identity, data)
+        return data
+
+
+    def stats(self) -> dict:
+        """Return the hit, miss and eviction counts and the memory used."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "limit": self.limit
+            }
+
+
+class Prefetcher:
+    """Loads likely next files into a FileCache in the background."""
+    def __init__(self, root, cache:FileCache, load):
+        self.cache = cache
+        self.load = load    # Called as load(path) in the worker.
+        self.recent = collections.deque(maxlen=PREFETCH_RECENT_FILES)
+        self.loader = BackgroundLoader(root, max_workers=1)
+        self.generation = 0
+
+
+    def candidates(self, path:str) -> list:
+        """Return the files to prefetch after path was opened, best first."""
+        path = os.path.normpath(path)
+        siblings = [os.path.normpath(sibling) for sibling in list_siblings(path)]
+        candidates = []
+        if path in siblings:
+            index = siblings.index(path)
+            candidates.extend(siblings[index + 1:index + 1 + PREFETCH_NEXT_FILES])
+            candidates.extend(siblings[max(index - 1, 0):index])
+        candidates.extend(reversed(self.recent))
+        # Keep the first occurrence of every file other than path.
+        return [candidate for candidate in dict.fromkeys(candidates) if candidate != path]
+
+
+    def prefetch(self, path:str):
+        """Note that path was opened and load the files likely to follow it."""
+        candidates = self.candidates(path)
+        path = os.path.normpath(path)
+        if path in self.recent:
+            self.recent.remove(path)
+        self.recent.append(path)
+
+        self.generation += 1
+        self.loader.submit(self.prefetch_files,
+                           candidates,
+                           self.generation,
+                           callback=lambda count: None,
+                           error_callback=lambda error: None)
+
+
+    def prefetch_files(self, paths:list, generation:int) -> int:
+        """Load the paths that are not cached yet, stopping when superseded."""
+        count = 0
+        for path in paths:
+            if generation != self.generation:
+                break
+            if path in self.cache or not os.path.isfile(path):
+                continue
+            with metrics.span("prefetch", path=path):
+                self.cache.load(path, self.load)
+            count += 1
+        return count
+
+
+    def shutdown(self):
+        """Stop prefetching."""
+        self.generation += 1
+        self.loader.shutdown()
+
+
+if __name__ == "__main__":
+    test_cache = FileCache(limit=4096)
+    from utils.load_data import load_task_data  # pylint: disable=ungrouped-imports
+    for test_path in list_siblings("data/general.txt") * 2:
+        if test_cache.get(test_path) is None:
+            test_cache.load(test_path, load_task_data)
+    print(test_cache.stats())
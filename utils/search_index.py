@@ -0,0 +1,249 @@
+"""Module for searching every review file in a directory tree.
+
+This module contains the SearchIndex class, an inverted index over every tab
+label, checkbox label and checkbox body of the review files in a directory
+and its subdirectories. Scanning the files for changes is separated from
+applying the changes to the index, so that the slow part can run in a worker
+thread while the index itself is only touched by the Tk thread.
+
+Classes:
+    SearchIndex: Inverted index over the review files in a directory tree.
+
+Functions:
+    scan_changes: Parse the review files that changed since the last scan.
+    tokenize: Split text into lower case search tokens.
+    write_index: Atomically store the documents of an index.
+
+Usage:
+    Call scan_changes in a worker with the identities returned by
+    SearchIndex.identities, apply the result with SearchIndex.apply, then use
+    SearchIndex.search to look up hits.
+"""
+
+import bisect
+import os
+import pickle
+import re
+import threading
+from utils.constants import CACHE_DIRECTORY, REVIEW_FILE_EXTENSION
+from utils.file_watcher import get_identity
+from utils.load_data import ERROR_TAB, load_task_data
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+SEARCH_INDEX_FILE = os.path.join(CACHE_DIRECTORY, "search_index.pickle")
+"""The file in which the search index is stored between runs."""
+
+
+def tokenize(text:str) -> list:
+    """Split text into lower case search tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def list_review_files(directory:str) -> list:
+    """Return the paths of every review file under directory."""
+    paths = []
+    for folder, subfolders, files in os.walk(directory):
+        # Skip hidden folders such as the cache.
+        subfolders[:] = sorted(name for name in subfolders if not name.startswith("."))
+        paths.extend(os.path.join(folder, name) for name in sorted(files)
+                     if name.endswith(f".{REVIEW_FILE_EXTENSION}"))
+    return paths
+
+
+def scan_changes(directory:str, identities:dict) -> dict:
+    """
+    Parse the review files that changed since the last scan.
+
+    Args:
+    - directory (str): The directory to scan.
+    - identities (dict): {path: (mtime, size)} of the indexed files.
+
+    Returns:
+    - dict: {path: document} for new or changed files, with a document of
+      None for files that were removed.
+    """
+    changes = {}
+    seen = set()
+    for path in list_review_files(directory):
+        seen.add(path)
+        identity = get_identity(path)
+        if identity is None:
+            continue
+        if identities.get(path) != identity:
+            changes[path] = index_file(path, identity)
+
+    for path in identities:
+        if path not in seen:
+            changes[path] = None
+    return changes
+
+
+def index_file(path:str, identity:tuple) -> dict:
+    """
+    Return the searchable document of a review file.
+
+    The document holds the hits of the file, one per tab label and one per
+    checkbox, and the tokens found in each hit. A file that cannot be read
+    or decoded gets a document without hits, so that it does not stop the
+    scan and is only read again once it changes.
+    """
+    hits = []       # [(tab_label, checkbox_index, checkbox_label), ...]
+    tokens = {}     # {token: [hit_index, ...]}
+
+    def add_hit(hit, text):
+        for token in set(tokenize(text)):
+            tokens.setdefault(token, []).append(len(hits))
+        hits.append(hit)
+
+    # Parsed without the disk cache, the index already tracks the identity
+    # of every file and would fill the cache with files nobody opened.
+    try:
+        data = load_task_data(path)
+    except (OSError, UnicodeDecodeError):
+        data = {}
+    for tab_label, checkboxes in data.items():
+        if tab_label == ERROR_TAB:
+            continue    # The problems of the file, not review text.
+        add_hit((tab_label, -1, ""), tab_label)
+        for checkbox_index, (label, text) in enumerate(checkboxes):
+            add_hit((tab_label, checkbox_index, label), f"{label}\n{text}")
+
+    return {"identity": identity, "hits": hits, "tokens": tokens}
+
+
+def write_index(directory:str, documents:dict, index_path:str=SEARCH_INDEX_FILE):
+    """
+    Atomically store the documents of an index, ignoring failures as the
+    index can always be rebuilt. Meant to run in a worker thread with a
+    copy of the documents, which are not changed once built.
+    """
+    temp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(temp_path, "wb") as file:
+            pickle.dump((directory, documents), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, index_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class SearchIndex:
+    """Inverted index over the review files in a directory tree."""
+    def __init__(self, directory:str):
+        self.directory = directory
+        self.documents = {}     # {path: document}
+        self.postings = {}      # {token: {(path, hit_index), ...}}
+        self.sorted_tokens = None   # Built on the first prefix search.
+
+
+    def identities(self) -> dict:
+        """Return {path: (mtime, size)} of every indexed file."""
+        return {path: document["identity"] for path, document in self.documents.items()}
+
+
+    def apply(self, changes:dict):
+        """Apply the changes returned by scan_changes."""
+        for path, document in changes.items():
+            self.remove_document(path)
+            if document is not None:
+                self.add_document(path, document)
+        if changes:
+            self.sorted_tokens = None
+
+
+    def add_document(self, path:str, document:dict):
+        """Add the hits of a document to the postings."""
+        self.documents[path] = document
+        for token, hit_indices in document["tokens"].items():
+            postings = self.postings.setdefault(token, set())
+            postings.update((path, hit_index) for hit_index in hit_indices)
+
+
+    def remove_document(self, path:str):
+        """Remove the hits of a document from the postings."""
+        document = self.documents.pop(path, None)
+        if document is None:
+            return
+        for token, hit_indices in document["tokens"].items():
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.difference_update((path, hit_index) for hit_index in hit_indices)
+            if not postings:
+                del self.postings[token]
+
+
+    def search(self, query:str, limit:int=50) -> list:
+        """
+        Return the hits matching every word of query.
+        The last word also matches tokens that start with it.
+
+        Returns:
+        - list: [(path, tab_label, checkbox_index, checkbox_label), ...] where
+          checkbox_index is -1 for hits on a tab label.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+
+        matches = None
+        for position, word in enumerate(words):
+            if position == len(words) - 1 and not query[-1:].isspace():
+                postings = self.prefix_postings(word)
+            else:
+                postings = self.postings.get(word, set())
+            matches = postings if matches is None else matches & postings
+            if not matches:
+                return []
+
+        results = []
+        for path, hit_index in sorted(matches)[:limit]:
+            tab_label, checkbox_index, label = self.documents[path]["hits"][hit_index]
+            results.append((path, tab_label, checkbox_index, label))
+        return results
+
+
+    def prefix_postings(self, prefix:str) -> set:
+        """Return the union of the postings of every token starting with prefix."""
+        if self.sorted_tokens is None:
+            self.sorted_tokens = sorted(self.postings)
+
+        postings = set()
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            postings |= self.postings[token]
+        return postings
+
+
+    def save(self, index_path:str=SEARCH_INDEX_FILE):
+        """Store the index, ignoring failures as it can always be rebuilt."""
+        write_index(self.directory, self.documents, index_path)
+
+
+    @classmethod
+    def load(cls, directory:str, index_path:str=SEARCH_INDEX_FILE):
+        """Return the stored index of directory, or an empty index."""
+        index = cls(directory)
+        try:
+            with open(index_path, "rb") as file:
+                stored_directory, documents = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError, IndexError, TypeError, ValueError):
+            return index
+
+        if stored_directory == directory:
+            for path, document in documents.items():
+                index.add_document(path, document)
+        return index
+
+
+if __name__ == "__main__":
+    # Index the data directory and run a few searches.
+    test_index = SearchIndex("data")
+    test_index.apply(scan_changes("data", test_index.identities()))
+    for test_query in ("aaa", "2b", "func", "❌"):
+        print(f"{test_query!r}:", test_index.search(test_query))
@@ -0,0 +1,69 @@
+"""Module for timing the stages of the application startup.
+
+This module contains the StartupProfile class, which records how long after
+the start of the process each stage of the startup finished. The window
+manager marks the first paint, when the window and its header have been
+drawn, and the point the application becomes interactive, when every frame
+is built and the shortcuts are bound.
+
+Classes:
+    StartupProfile: Records when each stage of the startup finished.
+
+Usage:
+    Create a StartupProfile as early as possible, or pass it the
+    time.perf_counter() value taken at the start of the process, call mark
+    at the end of every stage and print format() for the report.
+"""
+
+import time
+
+FIRST_PAINT = "first paint"
+"""The stage marked once the window and its header are drawn."""
+
+INTERACTIVE = "interactive"
+"""The stage marked once every frame is built and the shortcuts work."""
+
+
+class StartupProfile:
+    """Records when each stage of the startup finished."""
+    def __init__(self, started:float=None):
+        self.started = time.perf_counter() if started is None else started
+        self.marks = []     # [(stage, seconds since started), ...]
+
+
+    def mark(self, stage:str):
+        """Record that a stage finished now."""
+        self.marks.append((stage, time.perf_counter() - self.started))
+
+
+    def elapsed(self, stage:str) -> float:
+        """Return the seconds from the start to the end of a stage, or None."""
+        for name, seconds in self.marks:
+            if name == stage:
+                return seconds
+        return None
+
+
+    def stats(self) -> dict:
+        """Return {stage: milliseconds since the start} for the debug overlay."""
+        return {stage: round(seconds * 1000, 1) for stage, seconds in self.marks}
+
+
+    def format(self) -> str:
+        """Return the report listing every stage and the time it took."""
+        lines = ["Startup"]
+        previous = 0.0
+        for stage, seconds in self.marks:
+            lines.append(f"  {stage:<16}{seconds * 1000:>9.1f} ms"
+                         f"{(seconds - previous) * 1000:>+10.1f} ms")
+            previous = seconds
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    test_profile = StartupProfile()
+    for test_stage in ("window", FIRST_PAINT, INTERACTIVE):
+        time.sleep(0.01)
+        test_profile.mark(test_stage)
+    print(test_profile.format())
+    print(test_profile.stats())
@@ -0,0 +1,234 @@
+"""Module for the compact in-memory model of loaded review files.
+
+This module contains the classes holding the tabs and checkboxes of a loaded
+file. Every class uses __slots__, labels are interned and the text of every
+checkbox in a file is stored in one shared UTF-8 buffer, with each tab keeping
+the offsets of its checkboxes into that buffer. Texts are decoded when read,
+which keeps a single wide character from widening every text of the file.
+Tabs can be looked up by label or by position in constant time. The texts
+of a tab are compiled into templates the first time one is needed, see
+utils.template.
+
+The classes behave like the {label: [(label, text), ...]} dictionaries they
+replace: TaskData is a Mapping, Tab is a Sequence and Checkbox unpacks,
+indexes and compares like a (label, text) tuple.
+
+Classes:
+    Checkbox: A (label, text) pair backed by the shared text buffer.
+    Tab: Sequence of the checkboxes of one tab.
+    TaskData: Mapping of tab labels to tabs.
+
+Usage:
+    Validate the parsed dictionary with ensure_data_integrity, then build the
+    model with TaskData.from_dict. Use data.tab(index) to get a tab by its
+    position and data[label] to get it by its label.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from utils.template import Template
+
+
+class Checkbox:
+    """A (label, text) pair backed by the shared text buffer."""
+    __slots__ = ("label", "buffer", "start", "end")
+
+    def __init__(self, label:str, buffer:bytes, start:int, end:int):
+        self.label = label
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+
+
+    @property
+    def text(self) -> str:
+        """The text of the checkbox."""
+        return self.buffer[self.start:self.end].decode("utf-8")
+
+
+    def __len__(self):
+        return 2
+
+
+    def __getitem__(self, index):
+        return (self.label, self.text)[index]
+
+
+    def __iter__(self):
+        yield self.label
+        yield self.text
+
+
+    def __eq__(self, other):
+        if isinstance(other, (Checkbox, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+
+    def __repr__(self):
+        return repr(tuple(self))
+
+
+class Tab(Sequence):
+    """Sequence of the checkboxes of one tab."""
+    __slots__ = ("label", "index", "labels", "offsets", "buffer", "templates", "digest")
+
+    def __init__(self, label:str, index:int, labels:tuple, offsets:array, buffer:bytes,
+                 digest:bytes=None):
+        self.label = label
+        self.index = index      # Position of the tab in its file.
+        self.labels = labels    # Label of every checkbox.
+        self.offsets = offsets  # Start of every text in buffer, then the end.
+        self.buffer = buffer
+        self.templates = None   # {index: Template} of texts with placeholders.
+        self.digest = digest    # Hash of the bytes of the tab in its file, if known.
+
+
+    def __len__(self):
+        return len(self.labels)
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("checkbox index out of range")
+        return Checkbox(self.labels[index],
+                        self.buffer,
+                        self.offsets[index],
+                        self.offsets[index + 1])
+
+
+    def __eq__(self, other):
+        if isinstance(other, (Tab, list, tuple)):
+            return len(self) == len(other) and all(
+                checkbox == other_checkbox for checkbox, other_checkbox in zip(self, other)
+                )
+        return NotImplemented
+
+    __hash__ = None
+
+
+    def text(self, index:int) -> str:
+        """Return the text of a checkbox without creating a Checkbox."""
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+
+    def template(self, index:int) -> Template:
+        """
+        Return the template of a checkbox.
+        Every text of the tab is compiled on the first call, later calls
+        only look the template up.
+        """
+        if self.templates is None:
+            self.templates = {}
+            for text_index in range(len(self)):
+                template = Template.from_text(self.text(text_index))
+                if len(template.parts) > 1:
+                    self.templates[text_index] = template
+        template = self.templates.get(index)
+        if template is None:
+            return Template((self.text(index),))
+        return template
+
+
+    def __repr__(self):
+        return f"Tab({self.label!r}, {list(self)!r})"
+
+
+class TaskData(Mapping):
+    """Mapping of tab labels to tabs."""
+    __slots__ = ("tabs", "labels", "buffer")
+
+    def __init__(self, tabs:tuple, buffer:bytes):
+        self.tabs = tabs
+        self.labels = {tab.label: tab for tab in tabs}
+        self.buffer = buffer
+
+
+    @classmethod
+    def from_dict(cls, data:dict):
+        """
+        Build the model of a dictionary checked by ensure_data_integrity.
+
+        Args:
+        - data (dict): {label: [(label, text), ...], ...}
+
+        Returns:
+        - TaskData: The same data, with every text in one shared buffer.
+        """
+        texts = []
+        position = 0
+        layout = []     # [(label, labels, offsets), ...]
+        for label, checkboxes in data.items():
+            offsets = [position]
+            for _, text in checkboxes:
+                text = text.encode("utf-8")
+                texts.append(text)
+                position += len(text)
+                offsets.append(position)
+            labels = tuple(sys.intern(checkbox[0]) for checkbox in checkboxes)
+            layout.append((sys.intern(label), labels, offsets))
+
+        return cls.from_layout(layout, b"".join(texts))
+
+
+    @classmethod
+    def from_layout(cls, layout:list, buffer:bytes, digests:list=None):
+        """
+        Build the model of texts already joined into one buffer.
+
+        Args:
+        - layout (list): [(tab label, checkbox labels, offsets), ...] where
+          offsets holds the start of every text in buffer, then the end.
+        - buffer (bytes): The UTF-8 encoded texts of every checkbox.
+        - digests (list): The hash of the bytes of every tab in its file,
+          used to reuse unchanged tabs when the file is loaded again.
+
+        Returns:
+        - TaskData: The model sharing buffer between its tabs.
+        """
+        typecode = "I" if len(buffer) < 2 ** 32 else "Q"
+        digests = digests or [None] * len(layout)
+        tabs = tuple(
+            Tab(label, index, labels, array(typecode, offsets), buffer, digest)
+            for index, ((label, labels, offsets), digest) in enumerate(zip(layout, digests))
+            )
+        return cls(tabs, buffer)
+
+
+    def __getitem__(self, label):
+        return self.labels[label]
+
+
+    def __iter__(self):
+        return iter(self.labels)
+
+
+    def __len__(self):
+        return len(self.tabs)
+
+
+    def tab(self, index:int) -> Tab:
+        """Return the tab at a position."""
+        return self.tabs[index]
+
+
+    def __getstate__(self):
+        return (self.tabs, self.buffer)
+
+
+    def __setstate__(self, state):
+        self.tabs, self.buffer = state
+        self.labels = {tab.label: tab for tab in self.tabs}
+
+
+    def __repr__(self):
+        return f"TaskData({dict(self)!r})"
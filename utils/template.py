@@ -0,0 +1,124 @@
+"""Module for filling placeholders in the texts that are copied.
+
+Texts may contain placeholders written as bare uppercase words, such as NAME
+in "Thank you for your submission, NAME.". This module compiles a text once
+into a Template, which keeps the text split around its placeholders, so that
+filling it with the values of a session only joins the parts. Placeholders
+without a value are left as they are, so uppercase words that are not meant
+as placeholders are copied unchanged.
+
+The texts of a tab are compiled together the first time one of its
+templates is needed, see Tab.template, and the templates are kept with the
+loaded data for as long as the file stays in memory.
+
+Classes:
+    Template: A text split around its placeholders.
+
+Functions:
+    compile_template: Compile a text into a Template, with a cache.
+    get_template: Return the template of a checkbox of any loaded tab.
+    fill_templates: Fill and join the templates of several checkboxes.
+    parse_variables: Parse "NAME = value" lines into variables.
+
+Usage:
+    Call get_template(tab, index).fill(variables) to get the text of a
+    checkbox with the placeholders replaced by the values in variables.
+"""
+
+import functools
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"[A-Z](?<!\w[A-Z])[A-Z0-9_]+\b")
+"""Matches a placeholder, an uppercase word of at least two characters.
+The word boundary before it is checked after its first letter, a pattern
+starting with a set of letters is searched for much faster."""
+
+PLACEHOLDER_SPLIT_PATTERN = re.compile(f"({PLACEHOLDER_PATTERN.pattern})")
+"""Splits a text around its placeholders, keeping their names."""
+
+
+class Template:
+    """A text split around its placeholders."""
+    __slots__ = ("parts",)
+
+    def __init__(self, parts:tuple):
+        self.parts = parts  # (text, name, text, name, ..., text)
+
+
+    @classmethod
+    def from_text(cls, text:str):
+        """Compile a text, splitting it around its placeholders."""
+        return cls(tuple(PLACEHOLDER_SPLIT_PATTERN.split(text)))
+
+
+    @property
+    def names(self) -> tuple:
+        """The names of the placeholders, in order of appearance."""
+        return self.parts[1::2]
+
+
+    def fill(self, variables:dict) -> str:
+        """Return the text with every placeholder found in variables replaced."""
+        if len(self.parts) == 1:
+            return self.parts[0]
+        parts = list(self.parts)
+        parts[1::2] = [variables.get(name, name) for name in self.names]
+        return "".join(parts)
+
+
+    def __eq__(self, other):
+        if isinstance(other, Template):
+            return self.parts == other.parts
+        return NotImplemented
+
+
+    def __hash__(self):
+        return hash(self.parts)
+
+
+    def __repr__(self):
+        return f"Template({self.parts!r})"
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(text:str) -> Template:
+    """
+    Compile a text into a Template.
+    Results are cached, so texts of lists without templates of their own,
+    such as lazily loaded tabs, are only scanned once.
+    """
+    return Template.from_text(text)
+
+
+def get_template(items, index:int) -> Template:
+    """Return the template of a checkbox of a Tab or of a list of tuples."""
+    template = getattr(items, "template", None)
+    if template is not None:
+        return template(index)
+    return compile_template(items[index][1])
+
+
+def fill_templates(items, indexes, variables:dict, separator:str="\n") -> str:
+    """Fill the templates of the checkboxes at indexes and join them."""
+    return separator.join(get_template(items, index).fill(variables) for index in indexes)
+
+
+def parse_variables(text:str) -> dict:
+    """
+    Parse "NAME = value" lines into variables.
+    Lines without "=" and names or values that are empty are skipped.
+    """
+    variables = {}
+    for line in text.splitlines():
+        name, separator, value = line.partition("=")
+        name, value = name.strip(), value.strip()
+        if separator and name and value:
+            variables[name] = value
+    return variables
+
+
+if __name__ == "__main__":
+    test_template = compile_template("Thank you for your submission, NAME. Ask the TA.")
+    print(test_template)
+    print(test_template.fill({"NAME": "Ada"}))
+    print(parse_variables("NAME = Ada\nbroken line\nEMPTY =\n"))